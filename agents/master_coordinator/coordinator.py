@@ -4,9 +4,11 @@ Intelligent routing system for A2A communication with intent recognition
 """
 
 import asyncio
+import random
 import re
 import json
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, ClassVar, TypedDict
+from collections import deque
 from datetime import datetime
 import logging
 from enum import Enum
@@ -14,7 +16,15 @@ import os
 from pathlib import Path
 from openai import AsyncOpenAI
 
-class QueryType(Enum):
+from shared.utils.helpers import TTLStore
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+class QueryType(str, Enum):
     GREETING = "greeting"
     SIMPLE_CONVERSATION = "simple_conversation"
     SCHEDULING = "scheduling"
@@ -24,37 +34,257 @@ class QueryType(Enum):
     MULTI_AGENT = "multi_agent"
     UNKNOWN = "unknown"
 
+# Single-pass dispatch for fallback conversation replies; each named group maps
+# to a handler in MasterCoordinator._fallback_handlers
+_FALLBACK_RE = re.compile(
+    r"(?P<introduce>my name is|i am|call me|i'm)"
+    r"|(?P<thank>thank)"
+    r"|(?P<bye>bye|goodbye|see you)"
+    r"|(?P<help>help|what can you do)"
+    r"|(?P<who>who are you)"
+    r"|(?P<date>day|date|time|today)"
+    r"|(?P<your_name>your name|what are you called)"
+)
+
+# Single-pass scan for user information worth remembering; the name pattern
+# only peeks at the following word so later signals are still matched
+_EXTRACT_RE = re.compile(
+    r"(?P<name>(?:my name is|i'?m|call me|i am) (?=(?P<name_value>\w+)))"
+    r"|(?P<pref>i (?:like|prefer))"
+    r"|(?P<health>allergic|allergy|diet|vegetarian|vegan)"
+    r"|(?P<goal>my goal|want to|trying to|plan to)"
+)
+
+# Order in which matched groups win when a query hits several of them
+_FALLBACK_PRIORITY = ("introduce", "thank", "bye", "help", "who", "date", "your_name")
+
+# Literal keywords, one of which every GREETING and agent-domain intent pattern
+# requires. A query containing none of them always classifies as
+# SIMPLE_CONVERSATION, so batch classification can skip its regex pass.
+_INTENT_ANCHORS = (
+    # greeting
+    "hi", "hello", "hey", "good", "howdy", "how", "what", "greeting",
+    # scheduling
+    "schedule", "calendar", "meeting", "appointment", "plan", "when", "book",
+    "set", "free", "available", "busi",
+    # health & fitness
+    "workout", "exercise", "fitness", "gym", "run", "jog", "yoga", "heart",
+    "track", "weight", "muscle", "strength", "cardio",
+    # nutrition
+    "meal", "food", "recipe", "cook", "prepare", "healthy", "nutrition",
+    "calorie", "protein", "diet",
+    # shopping
+    "buy", "shop", "purchase", "inventory", "pantry", "need"
+)
+
+class FactEntry(TypedDict):
+    fact: str
+    timestamp: str
+
+class ConversationEntry(TypedDict):
+    query: str
+    response: str
+    intent: str
+    timestamp: str
+
+class MemoryFile(TypedDict, total=False):
+    user_profile: Dict[str, str]
+    preferences: Dict[str, str]
+    agent_interactions: Dict[str, Any]
+    important_facts: List[FactEntry]
+    conversation_context: List[ConversationEntry]
+
+# Schema-validating decoders for the memory file and its JSONL logs; they
+# produce plain dicts, so stdlib json is a drop-in fallback, including for
+# data that does not match the schema
+if MSGSPEC_AVAILABLE:
+    _memory_decoder = msgspec.json.Decoder(MemoryFile)
+    _fact_decoder = msgspec.json.Decoder(FactEntry)
+    _conversation_decoder = msgspec.json.Decoder(ConversationEntry)
+else:
+    _memory_decoder = _fact_decoder = _conversation_decoder = None
+
+def _decode_json(data: bytes, decoder=None) -> Any:
+    """Decode JSON with a typed msgspec decoder when available"""
+    if decoder is not None:
+        try:
+            return decoder.decode(data)
+        except msgspec.ValidationError as e:
+            # Never drop user memory over a schema mismatch
+            logging.warning(f"Memory data does not match its schema, loading it untyped: {e}")
+    return json.loads(data)
+
+_anchor_scanner = None
+
+def _get_anchor_scanner():
+    """
+    Build the Numba-compiled anchor scanner on first use.
+    Returns False when Numba (or NumPy) is not installed.
+    """
+    global _anchor_scanner
+    if _anchor_scanner is not None:
+        return _anchor_scanner
+    
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        _anchor_scanner = False
+        return _anchor_scanner
+    
+    @njit(cache=True)
+    def scan(text, text_offsets, keywords, keyword_offsets):
+        n_queries = text_offsets.shape[0] - 1
+        n_keywords = keyword_offsets.shape[0] - 1
+        hits = np.zeros(n_queries, dtype=np.bool_)
+        for q in range(n_queries):
+            q_start = text_offsets[q]
+            q_end = text_offsets[q + 1]
+            for k in range(n_keywords):
+                k_start = keyword_offsets[k]
+                k_len = keyword_offsets[k + 1] - k_start
+                for i in range(q_start, q_end - k_len + 1):
+                    j = 0
+                    while j < k_len and text[i + j] == keywords[k_start + j]:
+                        j += 1
+                    if j == k_len:
+                        hits[q] = True
+                        break
+                if hits[q]:
+                    break
+        return hits
+    
+    def pack(chunks):
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(c) for c in chunks])
+        return np.frombuffer(b"".join(chunks), dtype=np.uint8), offsets
+    
+    keywords, keyword_offsets = pack([a.encode() for a in _INTENT_ANCHORS])
+    
+    def scanner(queries: List[str]):
+        text, text_offsets = pack([q.encode("utf-8") for q in queries])
+        return scan(text, text_offsets, keywords, keyword_offsets)
+    
+    _anchor_scanner = scanner
+    return _anchor_scanner
+
 class UserMemory:
     """
     Manages persistent user memory and context
+    
+    Profile, preferences and agent interactions live in the JSON memory file;
+    facts and conversation context are appended to sibling JSONL logs so a new
+    entry costs one line write instead of re-serializing the whole memory.
     """
     
+    MAX_FACTS = 50
+    MAX_CONVERSATIONS = 20
+    # Rewrite a JSONL log down to its retained tail once it grows past this
+    COMPACT_THRESHOLD = 500
+    
+    # Raw memory file bytes keyed by path -> (mtime_ns, bytes), shared across
+    # instances. A newer mtime replaces the entry; decoding the cached bytes
+    # yields fresh objects and is cheaper than deep-copying a parsed tree.
+    _load_cache: ClassVar[TTLStore] = TTLStore(maxsize=256, ttl=3600)
+    
     def __init__(self, memory_file: str = "user_memory.json"):
         self.memory_file = Path(memory_file)
+        self.facts_file = self.memory_file.with_name(f"{self.memory_file.stem}_facts.jsonl")
+        self.conversations_file = self.memory_file.with_name(f"{self.memory_file.stem}_conversations.jsonl")
+        self._log_lines = {}
         self.memory = self._load_memory()
         self.conversation_history = []
         
     def _load_memory(self) -> Dict[str, Any]:
         """Load memory from file"""
-        if self.memory_file.exists():
-            try:
-                with open(self.memory_file, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        return {
+        memory = {
             "user_profile": {},
             "preferences": {},
             "important_facts": [],
             "conversation_context": [],
             "agent_interactions": {}
         }
+        if self.memory_file.exists():
+            try:
+                path = str(self.memory_file)
+                mtime = self.memory_file.stat().st_mtime_ns
+                entry = UserMemory._load_cache.get(path)
+                if entry is None or entry[0] != mtime:
+                    entry = (mtime, self.memory_file.read_bytes())
+                    UserMemory._load_cache[path] = entry
+                memory.update(_decode_json(entry[1], _memory_decoder))
+            except Exception:
+                pass
+        
+        memory["important_facts"] = self._load_log(
+            self.facts_file, memory["important_facts"], self.MAX_FACTS, _fact_decoder
+        )
+        memory["conversation_context"] = self._load_log(
+            self.conversations_file, memory["conversation_context"], self.MAX_CONVERSATIONS,
+            _conversation_decoder
+        )
+        return memory
+    
+    def _load_log(self, log_file: Path, legacy_entries: List[Dict[str, Any]], max_entries: int,
+                  decoder=None) -> List[Dict[str, Any]]:
+        """Replay the tail of a JSONL log, seeding it from legacy JSON entries on first use"""
+        if not log_file.exists():
+            entries = legacy_entries[-max_entries:]
+            self._rewrite_log(log_file, entries)
+            return entries
+        
+        try:
+            with open(log_file, 'rb') as f:
+                lines = deque((line for line in f if line.strip()), maxlen=self.COMPACT_THRESHOLD + 1)
+        except Exception as e:
+            logging.error(f"Failed to read {log_file}: {e}")
+            return legacy_entries[-max_entries:]
+        
+        entries = []
+        for line in list(lines)[-max_entries:]:
+            try:
+                entries.append(_decode_json(line, decoder))
+            except ValueError:
+                continue
+        
+        self._log_lines[log_file] = len(lines)
+        if len(lines) > self.COMPACT_THRESHOLD:
+            self._rewrite_log(log_file, entries)
+        return entries
+    
+    def _rewrite_log(self, log_file: Path, entries: List[Dict[str, Any]]):
+        """Replace a JSONL log with the given entries"""
+        try:
+            with open(log_file, 'w') as f:
+                f.writelines(json.dumps(entry, default=str) + "\n" for entry in entries)
+            self._log_lines[log_file] = len(entries)
+        except Exception as e:
+            logging.error(f"Failed to write {log_file}: {e}")
+    
+    def _append_log(self, log_file: Path, entry: Dict[str, Any], retained: List[Dict[str, Any]]):
+        """Append one entry to a JSONL log, compacting it when it grows too long"""
+        if self._log_lines.get(log_file, 0) >= self.COMPACT_THRESHOLD:
+            self._rewrite_log(log_file, retained)
+            return
+        try:
+            with open(log_file, 'a') as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+            self._log_lines[log_file] = self._log_lines.get(log_file, 0) + 1
+        except Exception as e:
+            logging.error(f"Failed to append to {log_file}: {e}")
     
     def _save_memory(self):
-        """Save memory to file"""
+        """Save profile, preferences and agent interactions to file"""
+        path = str(self.memory_file)
+        if path in UserMemory._load_cache:
+            del UserMemory._load_cache[path]
         try:
             with open(self.memory_file, 'w') as f:
-                json.dump(self.memory, f, indent=2, default=str)
+                json.dump({
+                    "user_profile": self.memory["user_profile"],
+                    "preferences": self.memory["preferences"],
+                    "agent_interactions": self.memory["agent_interactions"]
+                }, f, indent=2, default=str)
         except Exception as e:
             logging.error(f"Failed to save memory: {e}")
     
@@ -72,9 +302,9 @@ class UserMemory:
         }
         self.memory["important_facts"].append(fact_entry)
         # Keep only last 50 facts
-        if len(self.memory["important_facts"]) > 50:
-            self.memory["important_facts"] = self.memory["important_facts"][-50:]
-        self._save_memory()
+        if len(self.memory["important_facts"]) > self.MAX_FACTS:
+            self.memory["important_facts"] = self.memory["important_facts"][-self.MAX_FACTS:]
+        self._append_log(self.facts_file, fact_entry, self.memory["important_facts"])
     
     def set_preference(self, category: str, preference: str):
         """Set user preference"""
@@ -91,9 +321,9 @@ class UserMemory:
         }
         self.memory["conversation_context"].append(context_entry)
         # Keep only last 20 conversations
-        if len(self.memory["conversation_context"]) > 20:
-            self.memory["conversation_context"] = self.memory["conversation_context"][-20:]
-        self._save_memory()
+        if len(self.memory["conversation_context"]) > self.MAX_CONVERSATIONS:
+            self.memory["conversation_context"] = self.memory["conversation_context"][-self.MAX_CONVERSATIONS:]
+        self._append_log(self.conversations_file, context_entry, self.memory["conversation_context"])
     
     def get_user_name(self) -> Optional[str]:
         """Get user's name"""
@@ -101,54 +331,41 @@ class UserMemory:
     
     def get_context_summary(self) -> str:
         """Get a summary of relevant context for responses"""
-        context = []
-        
+        return "; ".join(self._iter_context())
+    
+    def _iter_context(self):
+        """Yield the context summary parts in order"""
         # Add user name if known
         if name := self.get_user_name():
-            context.append(f"User's name is {name}")
+            yield f"User's name is {name}"
         
         # Add recent important facts
-        recent_facts = self.memory["important_facts"][-5:]
-        for fact_entry in recent_facts:
-            context.append(f"Remember: {fact_entry['fact']}")
+        for fact_entry in self.memory["important_facts"][-5:]:
+            yield f"Remember: {fact_entry['fact']}"
         
         # Add preferences
         if self.memory["preferences"]:
-            prefs = ", ".join([f"{k}: {v}" for k, v in self.memory["preferences"].items()])
-            context.append(f"Preferences: {prefs}")
-        
-        return "; ".join(context) if context else ""
+            yield "Preferences: " + ", ".join(f"{k}: {v}" for k, v in self.memory["preferences"].items())
     
     def extract_and_store_info(self, query: str):
         """Extract and store important information from query"""
-        query_lower = query.lower()
-        
-        # Extract name
-        name_patterns = [
-            r'my name is (\w+)',
-            r'i\'?m (\w+)',
-            r'call me (\w+)',
-            r'i am (\w+)'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                name = match.group(1).capitalize()
-                self.update_user_profile("name", name)
-                break
-        
-        # Extract preferences
-        if "i like" in query_lower or "i prefer" in query_lower:
-            self.add_important_fact(query)
+        name = None
+        fact_kinds = set()
+        for match in _EXTRACT_RE.finditer(query.lower()):
+            kind = match.lastgroup
+            if kind == "name":
+                if name is None:
+                    name = match.group("name_value").capitalize()
+            else:
+                fact_kinds.add(kind)
         
-        # Extract health info
-        if any(word in query_lower for word in ['allergic', 'allergy', 'diet', 'vegetarian', 'vegan']):
-            self.add_important_fact(query)
+        if name:
+            self.update_user_profile("name", name)
         
-        # Extract goals
-        if any(phrase in query_lower for phrase in ['my goal', 'want to', 'trying to', 'plan to']):
-            self.add_important_fact(query)
+        # Preferences, health info and goals are each stored once
+        for kind in ("pref", "health", "goal"):
+            if kind in fact_kinds:
+                self.add_important_fact(query)
 
 class MasterCoordinator:
     """
@@ -258,6 +475,17 @@ class MasterCoordinator:
                 'who': "I'm the Master Coordinator for your Personal Life Coordination system. I intelligently route your requests to the right agents and handle simple conversations without bothering them unnecessarily."
             }
         }
+        
+        # Fallback reply builders keyed by _FALLBACK_RE group name
+        self._fallback_handlers = {
+            'introduce': self._fallback_introduce,
+            'thank': self._fallback_thank,
+            'bye': self._fallback_bye,
+            'help': self._fallback_help,
+            'who': self._fallback_who,
+            'date': self._fallback_date,
+            'your_name': self._fallback_who
+        }
     
     def analyze_intent(self, query: str) -> QueryType:
         """
@@ -294,6 +522,24 @@ class MasterCoordinator:
         # Default to simple conversation for unmatched queries instead of UNKNOWN
         return QueryType.SIMPLE_CONVERSATION
     
+    def batch_classify(self, queries: List[str]) -> List[QueryType]:
+        """
+        Classify many queries at once, e.g. when replaying logs for tuning.
+        Queries without any intent anchor keyword short-circuit to
+        SIMPLE_CONVERSATION; the rest go through analyze_intent.
+        """
+        lowered = [query.lower() for query in queries]
+        scanner = _get_anchor_scanner()
+        if scanner:
+            hits = scanner(lowered)
+        else:
+            hits = [any(anchor in query for anchor in _INTENT_ANCHORS) for query in lowered]
+        
+        return [
+            self.analyze_intent(query) if hit else QueryType.SIMPLE_CONVERSATION
+            for query, hit in zip(queries, hits)
+        ]
+    
     def determine_target_agents(self, intent: QueryType, query: str) -> List[str]:
         """
         Determine which agents should handle the query based on intent
@@ -342,7 +588,8 @@ class MasterCoordinator:
         self.memory.extract_and_store_info(query)
         
         intent = self.analyze_intent(query)
-        self.logger.info(f"Query intent classified as: {intent.value}")
+        intent_str = intent.value
+        self.logger.info(f"Query intent classified as: {intent_str}")
         
         # Handle non-agent queries directly
         if intent in [QueryType.GREETING, QueryType.SIMPLE_CONVERSATION]:
@@ -351,7 +598,7 @@ class MasterCoordinator:
             self.memory.add_conversation_context(
                 query, 
                 response['coordinator_response'], 
-                intent.value
+                intent_str
             )
             return response
         
@@ -364,7 +611,7 @@ class MasterCoordinator:
         # Create routing decision
         return {
             'routing_decision': {
-                'intent': intent.value,
+                'intent': intent_str,
                 'target_agents': target_agents,
                 'requires_agents': len(target_agents) > 0,
                 'multi_agent_workflow': len(target_agents) > 1,
@@ -391,7 +638,7 @@ class MasterCoordinator:
         
         return {
             'routing_decision': {
-                'intent': intent.value,
+                'intent': intent,
                 'target_agents': [],
                 'requires_agents': False,
                 'multi_agent_workflow': False,
@@ -460,7 +707,6 @@ Only mention the agents if specifically asked about your capabilities."""
         name_part = f" {user_name}" if user_name else ""
         
         if intent == QueryType.GREETING:
-            import random
             greetings = [
                 f"Hello{name_part}! I'm your Personal Life Coordination system. I'm here to help you manage your meals, health, shopping, and scheduling through my specialized agents.",
                 f"Hi there{name_part}! Your agents Milo (fitness), Luna (meals), Bucky (shopping), and Nani (scheduling) are all ready to help. What would you like to work on today?",
@@ -469,34 +715,37 @@ Only mention the agents if specifically asked about your capabilities."""
             return random.choice(greetings)
         
         elif intent == QueryType.SIMPLE_CONVERSATION:
-            query_lower = query.lower()
-            
-            # Handle name introduction
-            if any(phrase in query_lower for phrase in ['my name is', 'i am', 'call me', 'i\'m']):
-                if user_name:
-                    return f"Nice to meet you, {user_name}! I'll remember that. How can I help you today?"
-                else:
-                    return "Nice to meet you! I'll remember that. How can I help you today?"
-            
-            if 'thank' in query_lower:
-                return f"You're very welcome{name_part}! I'm here whenever you need help coordinating your personal life management."
-            elif any(word in query_lower for word in ['bye', 'goodbye', 'see you']):
-                return f"Goodbye{name_part}! Your agents will be here whenever you need them. Take care!"
-            elif 'help' in query_lower or 'what can you do' in query_lower:
-                return self.conversation_responses[QueryType.SIMPLE_CONVERSATION]['help']
-            elif 'who are you' in query_lower:
-                return self.conversation_responses[QueryType.SIMPLE_CONVERSATION]['who']
-            elif any(word in query_lower for word in ['day', 'date', 'time', 'today']):
-                from datetime import datetime
-                today = datetime.now()
-                return f"Today is {today.strftime('%A, %B %d, %Y')}, {user_name if user_name else 'there'}! The current time is {today.strftime('%I:%M %p')}."
-            elif any(phrase in query_lower for phrase in ['your name', 'tell me your name', 'what are you called']):
-                return self.conversation_responses[QueryType.SIMPLE_CONVERSATION]['who']
-            else:
+            matched = {m.lastgroup for m in _FALLBACK_RE.finditer(query.lower())}
+            kind = next((k for k in _FALLBACK_PRIORITY if k in matched), None)
+            if kind is None:
                 return f"I understand{name_part}! Is there anything specific you'd like help with regarding your meals, fitness, shopping, or schedule?"
+            return self._fallback_handlers[kind](user_name)
         
         return f"I'm here to help with whatever you need{name_part}!"
     
+    def _fallback_introduce(self, user_name: Optional[str]) -> str:
+        if user_name:
+            return f"Nice to meet you, {user_name}! I'll remember that. How can I help you today?"
+        return "Nice to meet you! I'll remember that. How can I help you today?"
+    
+    def _fallback_thank(self, user_name: Optional[str]) -> str:
+        name_part = f" {user_name}" if user_name else ""
+        return f"You're very welcome{name_part}! I'm here whenever you need help coordinating your personal life management."
+    
+    def _fallback_bye(self, user_name: Optional[str]) -> str:
+        name_part = f" {user_name}" if user_name else ""
+        return f"Goodbye{name_part}! Your agents will be here whenever you need them. Take care!"
+    
+    def _fallback_help(self, user_name: Optional[str]) -> str:
+        return self.conversation_responses[QueryType.SIMPLE_CONVERSATION]['help']
+    
+    def _fallback_who(self, user_name: Optional[str]) -> str:
+        return self.conversation_responses[QueryType.SIMPLE_CONVERSATION]['who']
+    
+    def _fallback_date(self, user_name: Optional[str]) -> str:
+        today = datetime.now()
+        return f"Today is {today.strftime('%A, %B %d, %Y')}, {user_name if user_name else 'there'}! The current time is {today.strftime('%I:%M %p')}."
+    
     async def _handle_unknown_query(self, query: str) -> Dict[str, Any]:
         """
         Handle queries that don't clearly match any intent
@@ -514,7 +763,7 @@ How would you like me to help?"""
         
         return {
             'routing_decision': {
-                'intent': 'unknown',
+                'intent': QueryType.UNKNOWN.value,
                 'target_agents': ['milo'],  # Default to Milo as general coordinator
                 'requires_agents': True,
                 'multi_agent_workflow': False,
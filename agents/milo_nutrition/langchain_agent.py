@@ -3,42 +3,153 @@ LangChain Milo Agent - Meal Planning & Nutrition
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-import json
-import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING, Dict, List, Any, Optional, Union, Callable, Tuple, Mapping, AsyncIterator, Iterator, Sequence,
+    Awaitable, ClassVar
+)
+import os
+import time
 
-from langchain.tools import BaseTool
-from langchain.schema import HumanMessage, AIMessage
+from langchain_core.pydantic_v1 import PrivateAttr
 
 from shared.langchain_framework.base_agent import LangChainBaseAgent, LangChainTool
-from shared.langchain_framework.a2a_coordinator import a2a_coordinator, A2AMessage
+from shared.langchain_framework.a2a_coordinator import a2a_coordinator
 from shared.utils.config import config_manager
+from shared.utils.helpers import TTLStore, json_dumps_bytes
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 # Global storage for tool data (in a real app, this would be a database)
-_recipe_data = {}
-_nutrition_data = {}
+_recipe_data = TTLStore(maxsize=10_000, ttl=3600)
+_nutrition_data = TTLStore(maxsize=10_000, ttl=3600)
+
+# Maximum in-flight actions per tool instance
+_TOOL_CONCURRENCY = int(os.getenv("MILO_TOOL_CONCURRENCY", "10"))
+
+@lru_cache(maxsize=None)
+def _transient_errors() -> Tuple[type, ...]:
+    """
+    Failures worth retrying; tools let these propagate instead of formatting them.
+    The client libraries are imported on first use rather than with the module.
+    """
+    import httpx
+    from openai import RateLimitError
+    return (RateLimitError, httpx.TransportError)
+
+# Generic per-food estimate: calories, protein (g), carbs (g), fat (g)
+_PER_FOOD_NUTRIENTS = (150, 8, 20, 5)
+
+# Static tool data, built once at import
+_MEAL_PLAN: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "breakfast": ("Oatmeal with berries", "Greek yogurt with granola", "Eggs and toast"),
+    "lunch": ("Grilled chicken salad", "Vegetable soup", "Quinoa bowl"),
+    "dinner": ("Salmon with vegetables", "Pasta with tomato sauce", "Stir-fried tofu")
+})
+
+_SHOPPING_CATEGORIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Proteins": ("Chicken breast", "Salmon fillets", "Eggs"),
+    "Dairy": ("Milk", "Greek yogurt"),
+    "Grains": ("Bread", "Oatmeal", "Granola", "Quinoa"),
+    "Produce": ("Berries", "Mixed vegetables", "Tomatoes", "Onions", "Garlic"),
+    "Pantry": ("Olive oil",)
+})
+
+# Plans are capped at 7 days, so every day's section can be formatted up front
+_PLAN_DAY_SECTIONS: Tuple[str, ...] = tuple(
+    f"Day {day}:\n"
+    f"  Breakfast: {_MEAL_PLAN['breakfast'][day % 3]}\n"
+    f"  Lunch: {_MEAL_PLAN['lunch'][day % 3]}\n"
+    f"  Dinner: {_MEAL_PLAN['dinner'][day % 3]}\n\n"
+    for day in range(1, 8)
+)
+
+# The mock shopping list does not depend on the meal plan, so format it once
+_SHOPPING_LIST_STR = "Shopping List:\n\n" + "".join(
+    f"{category}:\n" + "".join(f"  - {item}\n" for item in items) + "\n"
+    for category, items in _SHOPPING_CATEGORIES.items()
+)
+
+# Placeholder details returned for any recipe lookup
+_DEFAULT_RECIPE_INGREDIENTS = ("ingredient 1", "ingredient 2", "ingredient 3")
+_DEFAULT_RECIPE_INGREDIENTS_STR = ", ".join(_DEFAULT_RECIPE_INGREDIENTS)
+_DEFAULT_RECIPE_CALORIES = 400
+
+_AGE_RECOMMENDATIONS = (
+    "Focus on protein for muscle building",
+    "Balance protein, carbs, and healthy fats",
+    "Prioritize protein and calcium for bone health"
+)
+
+_ACTIVITY_RECOMMENDATIONS: Mapping[str, str] = MappingProxyType({
+    "sedentary": "Limit calorie intake to maintain weight",
+    "moderate": "Moderate calorie intake with balanced macros",
+    "active": "Higher calorie intake to support activity"
+})
+
+_GOAL_RECOMMENDATIONS: Mapping[str, str] = MappingProxyType({
+    "weight_loss": "Create a calorie deficit of 500 calories/day",
+    "muscle_gain": "Increase protein intake to 1.6-2.2g per kg body weight",
+    "maintenance": "Maintain current calorie intake with balanced nutrition"
+})
+
+# A2A handler results; converted to dicts only at the A2A boundary
+@dataclass(slots=True)
+class MealPlanResponse:
+    meal_plan: str
+    days_planned: int
+    dietary_considerations: List[str]
+
+@dataclass(slots=True)
+class NutritionResponse:
+    nutrition_analysis: str
+    foods_analyzed: List[str]
+
+@dataclass(slots=True)
+class RecipeResponse:
+    recipe: str
+    ingredients_used: List[str]
+
+@dataclass(slots=True)
+class ShoppingListResponse:
+    shopping_list: str
+    estimated_cost: str = "$75.00"
+
+@dataclass(slots=True)
+class FullPlanResponse:
+    meal_plan: str
+    days_planned: int
+    dietary_considerations: List[str]
+    nutrition_analysis: str
+    foods_analyzed: List[str]
+    shopping_list: str
+    estimated_cost: str = "$75.00"
 
 class RecipeEngineTool(LangChainTool):
     """LangChain tool for recipe generation"""
     
+    _sem: asyncio.Semaphore = PrivateAttr()
+    
     def __init__(self):
         super().__init__(
             name="recipe_engine",
             description="Generate recipes based on available ingredients and dietary preferences"
         )
+        self._sem = asyncio.Semaphore(_TOOL_CONCURRENCY)
     
     async def _arun(self, action: str, **kwargs) -> str:
         """Async execution of recipe engine actions"""
+        handler = self._ACTIONS.get(action)
+        if handler is None:
+            return f"Unknown action: {action}"
         try:
-            if action == "generate_recipe":
-                return await self._generate_recipe(**kwargs)
-            elif action == "find_recipes":
-                return await self._find_recipes(**kwargs)
-            elif action == "get_recipe":
-                return await self._get_recipe(**kwargs)
-            else:
-                return f"Unknown action: {action}"
+            async with self._sem:
+                return await handler(self, **kwargs)
+        except _transient_errors():
+            raise
         except Exception as e:
             return f"Error in recipe engine: {str(e)}"
     
@@ -46,9 +157,10 @@ class RecipeEngineTool(LangChainTool):
         """Sync execution - not implemented"""
         raise NotImplementedError("Use async execution")
     
-    async def _generate_recipe(self, ingredients: List[str], dietary_preferences: List[str] = [], **kwargs) -> str:
+    async def _generate_recipe(self, ingredients: List[str], dietary_preferences: Optional[Sequence[str]] = None, **kwargs) -> str:
         """Generate a recipe based on available ingredients"""
-        recipe_id = f"recipe_{datetime.now().timestamp()}"
+        dietary_preferences = dietary_preferences or ()
+        recipe_id = f"recipe_{time.monotonic_ns():x}"
         recipe = {
             "id": recipe_id,
             "name": f"Recipe with {', '.join(ingredients[:3])}",
@@ -62,7 +174,7 @@ class RecipeEngineTool(LangChainTool):
             "cooking_time": "30 minutes",
             "servings": 4,
             "calories_per_serving": 350,
-            "dietary_tags": dietary_preferences
+            "dietary_tags": list(dietary_preferences)
         }
         
         _recipe_data[recipe_id] = recipe
@@ -83,38 +195,37 @@ class RecipeEngineTool(LangChainTool):
     async def _get_recipe(self, recipe_name: str, **kwargs) -> str:
         """Get detailed recipe information"""
         # Mock recipe details
-        recipe_details = {
-            "name": recipe_name,
-            "ingredients": ["ingredient 1", "ingredient 2", "ingredient 3"],
-            "instructions": ["Step 1", "Step 2", "Step 3"],
-            "nutrition": {
-                "calories": 400,
-                "protein": "20g",
-                "carbs": "45g",
-                "fat": "15g"
-            }
-        }
-        
-        return f"Recipe: {recipe_name}\nIngredients: {', '.join(recipe_details['ingredients'])}\nCalories: {recipe_details['nutrition']['calories']}"
+        return f"Recipe: {recipe_name}\nIngredients: {_DEFAULT_RECIPE_INGREDIENTS_STR}\nCalories: {_DEFAULT_RECIPE_CALORIES}"
+    
+    # Action name -> coroutine, resolved once at class creation
+    _ACTIONS: ClassVar[Mapping[str, Callable[..., Awaitable[str]]]] = MappingProxyType({
+        "generate_recipe": _generate_recipe,
+        "find_recipes": _find_recipes,
+        "get_recipe": _get_recipe
+    })
 
 class NutritionAnalyzerTool(LangChainTool):
     """LangChain tool for nutrition analysis"""
     
+    _sem: asyncio.Semaphore = PrivateAttr()
+    
     def __init__(self):
         super().__init__(
             name="nutrition_analyzer",
             description="Analyze nutritional content of meals and provide dietary recommendations"
         )
+        self._sem = asyncio.Semaphore(_TOOL_CONCURRENCY)
     
     async def _arun(self, action: str, **kwargs) -> str:
         """Async execution of nutrition analysis actions"""
+        handler = self._ACTIONS.get(action)
+        if handler is None:
+            return f"Unknown action: {action}"
         try:
-            if action == "analyze_meal":
-                return await self._analyze_meal(**kwargs)
-            elif action == "get_recommendations":
-                return await self._get_nutrition_recommendations(**kwargs)
-            else:
-                return f"Unknown action: {action}"
+            async with self._sem:
+                return await handler(self, **kwargs)
+        except _transient_errors():
+            raise
         except Exception as e:
             return f"Error in nutrition analysis: {str(e)}"
     
@@ -124,24 +235,24 @@ class NutritionAnalyzerTool(LangChainTool):
     
     async def _analyze_meal(self, foods: List[str], **kwargs) -> str:
         """Analyze the nutritional content of a meal"""
-        # Mock nutrition analysis
-        total_calories = len(foods) * 150  # Rough estimate
-        protein = len(foods) * 8
-        carbs = len(foods) * 20
-        fat = len(foods) * 5
+        # Mock nutrition analysis: every food counts as the generic estimate
+        total_calories, protein, carbs, fat = (len(foods) * value for value in _PER_FOOD_NUTRIENTS)
         
-        analysis = f"Nutritional Analysis:\n"
-        analysis += f"Total Calories: {total_calories}\n"
-        analysis += f"Protein: {protein}g\n"
-        analysis += f"Carbohydrates: {carbs}g\n"
-        analysis += f"Fat: {fat}g\n"
+        parts = [
+            "Nutritional Analysis:",
+            f"Total Calories: {total_calories}",
+            f"Protein: {protein}g",
+            f"Carbohydrates: {carbs}g",
+            f"Fat: {fat}g",
+            ""
+        ]
         
         if total_calories > 800:
-            analysis += "\nNote: This is a high-calorie meal"
+            parts.append("Note: This is a high-calorie meal")
         elif total_calories < 300:
-            analysis += "\nNote: This is a light meal"
+            parts.append("Note: This is a light meal")
         
-        return analysis
+        return "\n".join(parts)
     
     async def _get_nutrition_recommendations(self, age: int, activity_level: str, goals: List[str], **kwargs) -> str:
         """Get personalized nutrition recommendations"""
@@ -149,49 +260,50 @@ class NutritionAnalyzerTool(LangChainTool):
         
         # Age-based recommendations
         if age < 30:
-            recommendations.append("Focus on protein for muscle building")
+            recommendations.append(_AGE_RECOMMENDATIONS[0])
         elif 30 <= age <= 50:
-            recommendations.append("Balance protein, carbs, and healthy fats")
+            recommendations.append(_AGE_RECOMMENDATIONS[1])
         else:
-            recommendations.append("Prioritize protein and calcium for bone health")
+            recommendations.append(_AGE_RECOMMENDATIONS[2])
         
         # Activity level recommendations
-        if activity_level == "sedentary":
-            recommendations.append("Limit calorie intake to maintain weight")
-        elif activity_level == "moderate":
-            recommendations.append("Moderate calorie intake with balanced macros")
-        elif activity_level == "active":
-            recommendations.append("Higher calorie intake to support activity")
+        activity_recommendation = _ACTIVITY_RECOMMENDATIONS.get(activity_level)
+        if activity_recommendation is not None:
+            recommendations.append(activity_recommendation)
         
         # Goal-based recommendations
-        for goal in goals:
-            if goal == "weight_loss":
-                recommendations.append("Create a calorie deficit of 500 calories/day")
-            elif goal == "muscle_gain":
-                recommendations.append("Increase protein intake to 1.6-2.2g per kg body weight")
-            elif goal == "maintenance":
-                recommendations.append("Maintain current calorie intake with balanced nutrition")
+        recommendations.extend(_GOAL_RECOMMENDATIONS[goal] for goal in goals if goal in _GOAL_RECOMMENDATIONS)
         
-        return "Nutrition Recommendations:\n" + "\n".join([f"- {rec}" for rec in recommendations])
+        return "Nutrition Recommendations:\n" + "\n".join(f"- {rec}" for rec in recommendations)
+    
+    # Action name -> coroutine, resolved once at class creation
+    _ACTIONS: ClassVar[Mapping[str, Callable[..., Awaitable[str]]]] = MappingProxyType({
+        "analyze_meal": _analyze_meal,
+        "get_recommendations": _get_nutrition_recommendations
+    })
 
 class MealPlannerTool(LangChainTool):
     """LangChain tool for meal planning"""
     
+    _sem: asyncio.Semaphore = PrivateAttr()
+    
     def __init__(self):
         super().__init__(
             name="meal_planner",
             description="Create meal plans and shopping lists based on dietary preferences"
         )
+        self._sem = asyncio.Semaphore(_TOOL_CONCURRENCY)
     
     async def _arun(self, action: str, **kwargs) -> str:
         """Async execution of meal planning actions"""
+        handler = self._ACTIONS.get(action)
+        if handler is None:
+            return f"Unknown action: {action}"
         try:
-            if action == "create_meal_plan":
-                return await self._create_meal_plan(**kwargs)
-            elif action == "generate_shopping_list":
-                return await self._generate_shopping_list(**kwargs)
-            else:
-                return f"Unknown action: {action}"
+            async with self._sem:
+                return await handler(self, **kwargs)
+        except _transient_errors():
+            raise
         except Exception as e:
             return f"Error in meal planning: {str(e)}"
     
@@ -199,52 +311,36 @@ class MealPlannerTool(LangChainTool):
         """Sync execution - not implemented"""
         raise NotImplementedError("Use async execution")
     
-    async def _create_meal_plan(self, days: int = 7, dietary_preferences: List[str] = [], **kwargs) -> str:
+    async def _astream(self, action: str, **kwargs) -> AsyncIterator[str]:
+        """Async streaming of meal planning actions; non-streamable actions yield once"""
+        if action == "create_meal_plan":
+            for part in self._meal_plan_parts(**kwargs):
+                yield part
+        else:
+            yield await self._arun(action, **kwargs)
+    
+    async def _create_meal_plan(self, days: int = 7, dietary_preferences: Optional[Sequence[str]] = None, **kwargs) -> str:
         """Create a meal plan for specified number of days"""
-        meal_plan = {
-            "breakfast": ["Oatmeal with berries", "Greek yogurt with granola", "Eggs and toast"],
-            "lunch": ["Grilled chicken salad", "Vegetable soup", "Quinoa bowl"],
-            "dinner": ["Salmon with vegetables", "Pasta with tomato sauce", "Stir-fried tofu"]
-        }
-        
-        plan = f"Meal Plan for {days} days:\n\n"
-        for day in range(1, min(days + 1, 8)):
-            plan += f"Day {day}:\n"
-            plan += f"  Breakfast: {meal_plan['breakfast'][day % 3]}\n"
-            plan += f"  Lunch: {meal_plan['lunch'][day % 3]}\n"
-            plan += f"  Dinner: {meal_plan['dinner'][day % 3]}\n\n"
+        return "".join(self._meal_plan_parts(days, dietary_preferences))
+    
+    def _meal_plan_parts(self, days: int = 7, dietary_preferences: Optional[Sequence[str]] = None, **kwargs) -> Iterator[str]:
+        """Yield the meal plan header, one section per day, then the preferences note"""
+        yield f"Meal Plan for {days} days:\n\n"
+        yield from _PLAN_DAY_SECTIONS[:max(days, 0)]
         
         if dietary_preferences:
-            plan += f"Dietary preferences considered: {', '.join(dietary_preferences)}"
-        
-        return plan
+            yield f"Dietary preferences considered: {', '.join(dietary_preferences)}"
     
     async def _generate_shopping_list(self, meal_plan: Dict[str, Any], **kwargs) -> str:
         """Generate shopping list from meal plan"""
         # Mock shopping list generation
-        ingredients = [
-            "Chicken breast", "Salmon fillets", "Eggs", "Milk", "Bread",
-            "Oatmeal", "Berries", "Greek yogurt", "Granola", "Quinoa",
-            "Mixed vegetables", "Tomatoes", "Onions", "Garlic", "Olive oil"
-        ]
-        
-        # Organize by category
-        categories = {
-            "Proteins": ["Chicken breast", "Salmon fillets", "Eggs"],
-            "Dairy": ["Milk", "Greek yogurt"],
-            "Grains": ["Bread", "Oatmeal", "Granola", "Quinoa"],
-            "Produce": ["Berries", "Mixed vegetables", "Tomatoes", "Onions", "Garlic"],
-            "Pantry": ["Olive oil"]
-        }
-        
-        shopping_list = "Shopping List:\n\n"
-        for category, items in categories.items():
-            shopping_list += f"{category}:\n"
-            for item in items:
-                shopping_list += f"  - {item}\n"
-            shopping_list += "\n"
-        
-        return shopping_list
+        return _SHOPPING_LIST_STR
+    
+    # Action name -> coroutine, resolved once at class creation
+    _ACTIONS: ClassVar[Mapping[str, Callable[..., Awaitable[str]]]] = MappingProxyType({
+        "create_meal_plan": _create_meal_plan,
+        "generate_shopping_list": _generate_shopping_list
+    })
 
 class LangChainMiloAgent(LangChainBaseAgent):
     """LangChain-based Milo Nutrition Agent"""
@@ -253,23 +349,88 @@ class LangChainMiloAgent(LangChainBaseAgent):
         if config is None:
             config = config_manager.load_config("milo")
         
+        # Handler results keyed by (intent, canonical payload)
+        performance_config = config.get("performance", {})
+        self._handler_cache = TTLStore(
+            maxsize=performance_config.get("cache_size", 1000),
+            ttl=performance_config.get("handler_cache_ttl", 300)
+        )
+        
+        # Nutrition analyses arriving within one window are sent to the tool as a batch
+        self._nutrition_batch: List[Tuple[List[str], asyncio.Future]] = []
+        self._nutrition_flush_task: Optional[asyncio.Task] = None
+        self._batch_window = performance_config.get("batch_window_ms", 20) / 1000
+        self._batch_max_concurrency = performance_config.get("batch_max_concurrency", 10)
+        
         super().__init__("milo", config)
         
         # Register with A2A coordinator
         a2a_coordinator.register_agent(self)
     
+    @classmethod
+    async def create(cls, config: Optional[Dict[str, Any]] = None) -> "LangChainMiloAgent":
+        """Create the agent from async code without blocking the event loop on config loading"""
+        if config is None:
+            config = await asyncio.to_thread(config_manager.load_config, "milo")
+        return cls(config=config)
+    
+    def _initialize_llm(self) -> "ChatOpenAI":
+        """Initialize Milo's model with its own prompt cache"""
+        # Repeated prompts are answered from the cache instead of a model round-trip.
+        # The cache is set on this model only, not process-wide, so other agents are
+        # unaffected. Imported here since langchain_community.cache pulls in SQLAlchemy.
+        from langchain_community.cache import SQLiteCache
+        llm = super()._initialize_llm()
+        llm.cache = SQLiteCache(
+            database_path=self.config.get("performance", {}).get("llm_cache_path", ".milo_cache.db")
+        )
+        return llm
+    
     def _register_tools(self):
         """Register Milo's tools"""
-        self.add_tool(RecipeEngineTool())
-        self.add_tool(NutritionAnalyzerTool())
-        self.add_tool(MealPlannerTool())
+        self._tool_by_name: Dict[str, LangChainTool] = {}
+        for tool in (RecipeEngineTool(), NutritionAnalyzerTool(), MealPlannerTool()):
+            self._tool_by_name[tool.name] = tool
+            self.add_tool(tool)
     
     def _register_a2a_handlers(self):
         """Register A2A message handlers"""
-        self.register_a2a_handler("meal_planning_request", self._handle_meal_planning)
-        self.register_a2a_handler("nutrition_analysis", self._handle_nutrition_analysis)
+        # Only side-effect-free intents are cached; each recipe is newly
+        # generated and stored under its own id, so recipe_generation never is
+        self.register_a2a_handler("meal_planning_request", self._cached_handler("meal_planning_request", self._handle_meal_planning))
+        self.register_a2a_handler("nutrition_analysis", self._cached_handler("nutrition_analysis", self._handle_nutrition_analysis))
         self.register_a2a_handler("recipe_generation", self._handle_recipe_generation)
-        self.register_a2a_handler("shopping_list_generation", self._handle_shopping_list)
+        self.register_a2a_handler("shopping_list_generation", self._cached_handler("shopping_list_generation", self._handle_shopping_list))
+        self.register_a2a_handler("full_plan_request", self._cached_handler("full_plan_request", self._handle_full_plan))
+        self.register_a2a_stream_handler("meal_planning_request", self._handle_meal_planning_stream)
+    
+    def _cached_handler(self, intent: str, handler: Callable) -> Callable:
+        """Wrap an A2A handler so identical payloads are served from a TTL cache"""
+        async def cached(payload: Dict[str, Any], message_data: Dict[str, Any]) -> Dict[str, Any]:
+            key = (intent, json_dumps_bytes(payload, sort_keys=True))
+            
+            result = self._handler_cache.get(key)
+            if result is not None:
+                return result
+            
+            result = await handler(payload, message_data)
+            if not (isinstance(result, dict) and "error" in result):
+                self._handler_cache[key] = result
+            return result
+        
+        return cached
+    
+    async def _safe_arun(self, tool_name: str, action: str, **kwargs) -> str:
+        """Run a tool action, retrying transient failures with exponential backoff"""
+        from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+        async for attempt in AsyncRetrying(
+            wait=wait_exponential(multiplier=2, min=2, max=16),
+            stop=stop_after_attempt(4),
+            retry=retry_if_exception_type(_transient_errors()),
+            reraise=True
+        ):
+            with attempt:
+                return await self._tool_by_name[tool_name]._arun(action, **kwargs)
     
     def _get_system_prompt(self) -> str:
         return """You are Milo, a meal planning and nutrition assistant. 
@@ -284,61 +445,145 @@ class LangChainMiloAgent(LangChainBaseAgent):
         
         Always use your tools to provide accurate and helpful information. Consider dietary restrictions and health goals."""
     
-    async def _handle_meal_planning(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_meal_planning(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Union[MealPlanResponse, Dict[str, Any]]:
         """Handle meal planning requests"""
         try:
             days = payload.get("days", 7)
             dietary_preferences = payload.get("dietary_preferences", [])
             
-            meal_plan = await self.tools[2]._arun("create_meal_plan", days=days, dietary_preferences=dietary_preferences)
+            meal_plan = await self._safe_arun("meal_planner", "create_meal_plan", days=days, dietary_preferences=dietary_preferences)
             
-            return {
-                "meal_plan": meal_plan,
-                "days_planned": days,
-                "dietary_considerations": dietary_preferences
-            }
+            return MealPlanResponse(
+                meal_plan=meal_plan,
+                days_planned=days,
+                dietary_considerations=dietary_preferences
+            )
         except Exception as e:
             return {"error": str(e)}
     
-    async def _handle_nutrition_analysis(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_meal_planning_stream(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a meal plan one section at a time"""
+        days = payload.get("days", 7)
+        dietary_preferences = payload.get("dietary_preferences", [])
+        
+        async for chunk in self._tool_by_name["meal_planner"]._astream(
+            "create_meal_plan", days=days, dietary_preferences=dietary_preferences
+        ):
+            yield {"meal_plan_chunk": chunk}
+        
+        yield {
+            "done": True,
+            "days_planned": days,
+            "dietary_considerations": dietary_preferences
+        }
+    
+    async def _handle_nutrition_analysis(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Union[NutritionResponse, Dict[str, Any]]:
         """Handle nutrition analysis requests"""
         try:
             foods = payload.get("foods", [])
             
-            analysis = await self.tools[1]._arun("analyze_meal", foods=foods)
+            analysis = await self._batched_nutrition_analysis(foods)
             
-            return {
-                "nutrition_analysis": analysis,
-                "foods_analyzed": foods
-            }
+            return NutritionResponse(
+                nutrition_analysis=analysis,
+                foods_analyzed=foods
+            )
         except Exception as e:
             return {"error": str(e)}
     
-    async def _handle_recipe_generation(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _batched_nutrition_analysis(self, foods: List[str]) -> str:
+        """Queue a meal analysis and wait for the batch it lands in"""
+        future = asyncio.get_running_loop().create_future()
+        self._nutrition_batch.append((foods, future))
+        if self._nutrition_flush_task is None:
+            self._nutrition_flush_task = asyncio.create_task(self._flush_nutrition_batch())
+        return await future
+    
+    async def _flush_nutrition_batch(self):
+        """Run every queued meal analysis through one abatch call, retrying transient failures"""
+        await asyncio.sleep(self._batch_window)
+        batch, self._nutrition_batch = self._nutrition_batch, []
+        self._nutrition_flush_task = None
+        
+        try:
+            results = await self._tool_by_name["nutrition_analyzer"].abatch(
+                [{"action": "analyze_meal", "foods": foods} for foods, _ in batch],
+                config={"max_concurrency": self._batch_max_concurrency},
+                return_exceptions=True
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        # abatch does not go through _safe_arun, so retry transient failures per item
+        results = list(results)
+        retry_indices = [i for i, result in enumerate(results) if isinstance(result, _transient_errors())]
+        if retry_indices:
+            limit = asyncio.Semaphore(self._batch_max_concurrency)
+            
+            async def retry_item(foods: List[str]) -> str:
+                async with limit:
+                    return await self._safe_arun("nutrition_analyzer", "analyze_meal", foods=foods)
+            
+            retried = await asyncio.gather(
+                *(retry_item(batch[i][0]) for i in retry_indices), return_exceptions=True
+            )
+            for i, result in zip(retry_indices, retried):
+                results[i] = result
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def _handle_recipe_generation(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Union[RecipeResponse, Dict[str, Any]]:
         """Handle recipe generation requests"""
         try:
             ingredients = payload.get("ingredients", [])
             dietary_preferences = payload.get("dietary_preferences", [])
             
-            recipe = await self.tools[0]._arun("generate_recipe", ingredients=ingredients, dietary_preferences=dietary_preferences)
+            recipe = await self._safe_arun("recipe_engine", "generate_recipe", ingredients=ingredients, dietary_preferences=dietary_preferences)
             
-            return {
-                "recipe": recipe,
-                "ingredients_used": ingredients
-            }
+            return RecipeResponse(
+                recipe=recipe,
+                ingredients_used=ingredients
+            )
         except Exception as e:
             return {"error": str(e)}
     
-    async def _handle_shopping_list(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_shopping_list(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Union[ShoppingListResponse, Dict[str, Any]]:
         """Handle shopping list generation requests"""
         try:
             meal_plan = payload.get("meal_plan", {})
             
-            shopping_list = await self.tools[2]._arun("generate_shopping_list", meal_plan=meal_plan)
+            shopping_list = await self._safe_arun("meal_planner", "generate_shopping_list", meal_plan=meal_plan)
             
-            return {
-                "shopping_list": shopping_list,
-                "estimated_cost": "$75.00"
-            }
+            return ShoppingListResponse(shopping_list=shopping_list)
         except Exception as e:
-            return {"error": str(e)} 
\ No newline at end of file
+            return {"error": str(e)}
+    
+    async def _handle_full_plan(self, payload: Dict[str, Any], message_data: Dict[str, Any]) -> Union[FullPlanResponse, Dict[str, Any]]:
+        """Handle combined meal plan, nutrition analysis and shopping list requests"""
+        try:
+            days = payload.get("days", 7)
+            dietary_preferences = payload.get("dietary_preferences", [])
+            foods = payload.get("foods", [])
+            # The three tool calls are independent, so run them concurrently
+            meal_plan, analysis, shopping_list = await asyncio.gather(
+                self._safe_arun("meal_planner", "create_meal_plan", days=days, dietary_preferences=dietary_preferences),
+                self._safe_arun("nutrition_analyzer", "analyze_meal", foods=foods),
+                self._safe_arun("meal_planner", "generate_shopping_list", meal_plan=payload.get("meal_plan", {}))
+            )
+            
+            return FullPlanResponse(
+                meal_plan=meal_plan,
+                days_planned=days,
+                dietary_considerations=dietary_preferences,
+                nutrition_analysis=analysis,
+                foods_analyzed=foods,
+                shopping_list=shopping_list
+            )
+        except Exception as e:
+            return {"error": str(e)}
@@ -4,15 +4,338 @@ Meal planning and nutrition analysis using MCP protocol
 """
 
 import asyncio
-import json
+import itertools
 import logging
+import sys
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, AsyncIterator, Awaitable, Callable, Final, Mapping, Tuple
 
-from shared.mcp_framework.mcp_server_base import BaseMCPServer
-from agents.milo_nutrition.tools.meal_planner import MealPlannerTool
-from agents.milo_nutrition.tools.nutrition_analyzer import NutritionAnalyzerTool
-from agents.milo_nutrition.tools.recipe_engine import RecipeEngineTool
+import numpy as np
+from pydantic import BaseModel
+
+from shared.mcp_framework.mcp_server_base import BaseMCPServer, MCPResource, MCPTool
+from shared.utils.helpers import TTLStore, json_dumps_bytes, json_loads_bytes
+
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
+
+
+_MEAL_PLANNER_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "dietary_restrictions": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "List of dietary restrictions (vegetarian, vegan, gluten-free, etc.)"
+        },
+        "calories_target": {
+            "type": "integer",
+            "description": "Target daily calories"
+        },
+        "meals_per_day": {
+            "type": "integer",
+            "default": 3,
+            "description": "Number of meals per day"
+        },
+        "days": {
+            "type": "integer",
+            "default": 7,
+            "description": "Number of days to plan for"
+        },
+        "cuisine_preferences": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Preferred cuisines"
+        },
+        "exclude_ingredients": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Ingredients to exclude"
+        }
+    },
+    "required": ["calories_target"]
+}
+
+_NUTRITION_ANALYZER_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "food_items": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "List of food items to analyze"
+        },
+        "recipe": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "ingredients": {"type": "array", "items": {"type": "string"}},
+                "servings": {"type": "integer"}
+            },
+            "description": "Recipe to analyze"
+        },
+        "analysis_type": {
+            "type": "string",
+            "enum": ["basic", "detailed", "macro_breakdown"],
+            "default": "basic",
+            "description": "Type of nutritional analysis"
+        }
+    }
+}
+
+_RECIPE_GENERATOR_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "ingredients": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Available ingredients"
+        },
+        "recipe_type": {
+            "type": "string",
+            "enum": ["breakfast", "lunch", "dinner", "snack", "dessert"],
+            "description": "Type of recipe to generate"
+        },
+        "cooking_time": {
+            "type": "integer",
+            "description": "Maximum cooking time in minutes"
+        },
+        "difficulty": {
+            "type": "string",
+            "enum": ["easy", "medium", "hard"],
+            "default": "medium",
+            "description": "Recipe difficulty level"
+        },
+        "dietary_requirements": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Dietary requirements to follow"
+        },
+        "cuisine_style": {
+            "type": "string",
+            "description": "Preferred cuisine style"
+        }
+    },
+    "required": ["ingredients", "recipe_type"]
+}
+
+_MEAL_OPTIMIZER_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "current_meal_plan": {
+            "type": "object",
+            "description": "Current meal plan to optimize"
+        },
+        "optimization_goals": {
+            "type": "array",
+            "items": {"type": "string", "enum": ["nutrition", "cost", "time", "variety"]},
+            "description": "Optimization priorities"
+        },
+        "budget_constraint": {
+            "type": "number",
+            "description": "Budget constraint for the meal plan"
+        },
+        "prep_time_limit": {
+            "type": "integer",
+            "description": "Maximum preparation time per meal in minutes"
+        }
+    },
+    "required": ["current_meal_plan", "optimization_goals"]
+}
+
+class MealPlannerArgs(BaseModel):
+    """meal_planner arguments; defaults mirror _MEAL_PLANNER_SCHEMA"""
+    calories_target: Optional[int] = None
+    dietary_restrictions: List[str] = []
+    meals_per_day: int = 3
+    days: int = 7
+    cuisine_preferences: List[str] = []
+    exclude_ingredients: List[str] = []
+
+
+class NutritionAnalyzerArgs(BaseModel):
+    """nutrition_analyzer arguments; defaults mirror _NUTRITION_ANALYZER_SCHEMA"""
+    food_items: List[str] = []
+    recipe: Optional[Dict[str, Any]] = None
+    analysis_type: str = "basic"
+
+
+class RecipeGeneratorArgs(BaseModel):
+    """recipe_generator arguments; defaults mirror _RECIPE_GENERATOR_SCHEMA"""
+    ingredients: List[str] = []
+    recipe_type: Optional[str] = None
+    cooking_time: int = 30
+    difficulty: str = "medium"
+    dietary_requirements: List[str] = []
+    cuisine_style: str = "international"
+
+
+class MealOptimizerArgs(BaseModel):
+    """meal_optimizer arguments; defaults mirror _MEAL_OPTIMIZER_SCHEMA"""
+    current_meal_plan: Dict[str, Any] = {}
+    optimization_goals: List[str] = []
+    budget_constraint: Optional[float] = None
+    prep_time_limit: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ToolSpec:
+    """Declarative tool registration: schema plus the name of the handler method"""
+    name: str
+    description: str
+    input_schema: Dict[str, Any]
+    handler: str
+
+
+# Meal plan building blocks. Plans can run to hundreds of days, so these are
+# slotted dataclasses rather than dicts; json_dumps_bytes encodes them directly.
+@dataclass(slots=True)
+class PlannedRecipe:
+    name: str
+    ingredients: Tuple[str, ...]
+    calories: int
+    prep_time: int
+    difficulty: str
+    macros: Dict[str, float]
+
+
+@dataclass(slots=True)
+class PlannedMeal:
+    meal_type: str
+    time: str
+    recipes: List[PlannedRecipe]
+    total_calories: int
+
+
+@dataclass(slots=True)
+class DailyPlan:
+    day: int
+    date: str
+    meals: List[PlannedMeal]
+    total_calories: int
+    macros: Dict[str, int]
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Compile a tool input schema; a pass-through when fastjsonschema is missing"""
+    if FASTJSONSCHEMA_AVAILABLE:
+        return fastjsonschema.compile(schema)
+    return lambda arguments: arguments
+
+# Static resource bodies as UTF-8 bytes, serialized once at import instead of on every read
+_RESOURCE_CONTENTS: Final[Mapping[str, bytes]] = MappingProxyType({
+    "milo://nutrition-database": json_dumps_bytes({
+        "database": "USDA Food Database",
+        "foods_count": 15000,
+        "last_updated": "2025-08-10",
+        "sample_foods": [
+            {"name": "Apple", "calories_per_100g": 52, "nutrients": {"vitamin_c": 4.6}},
+            {"name": "Chicken Breast", "calories_per_100g": 165, "nutrients": {"protein": 31}}
+        ]
+    }, indent=True),
+    "milo://recipe-database": json_dumps_bytes({
+        "recipes_count": 5000,
+        "categories": ["breakfast", "lunch", "dinner", "snacks", "desserts"],
+        "sample_recipes": [
+            {"name": "Quinoa Buddha Bowl", "calories": 380, "prep_time": 25},
+            {"name": "Grilled Salmon", "calories": 290, "prep_time": 15}
+        ]
+    }, indent=True),
+    "milo://dietary-guidelines": """# Dietary Guidelines
+
+## Daily Caloric Needs
+- Adult Women: 1800-2400 calories
+- Adult Men: 2200-3000 calories
+
+## Macronutrient Distribution
+- Carbohydrates: 45-65% of total calories
+- Protein: 10-35% of total calories  
+- Fat: 20-35% of total calories
+
+## Key Recommendations
+- Include variety of vegetables and fruits
+- Choose whole grains over refined grains
+- Include lean proteins and healthy fats
+- Limit added sugars and sodium
+""".encode()
+})
+
+# Plans longer than this many days yield to the event loop every this many days
+_COOPERATIVE_PLAN_DAYS = 30
+
+# Goals meal_optimizer understands, in the order their results are applied
+_OPTIMIZATION_GOALS = ("cost", "time", "nutrition", "variety")
+
+# Invariant pieces of tool responses. They are shared across calls rather
+# than rebuilt each time; mappings are read-only and copied into responses.
+_MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+_RECIPE_MEAL_TIMES = ("08:00", "12:00", "18:00", "15:00")
+# (meal type, time, recipe name) per meal slot; a plan takes the first meals_per_day
+_MEAL_SLOTS: Tuple[Tuple[str, str, str], ...] = tuple(
+    (meal_type, meal_time, f"Healthy {meal_type.title()}")
+    for meal_type, meal_time in zip(_MEAL_TYPES, _RECIPE_MEAL_TIMES)
+)
+_GENERATED_RECIPE_NAMES: Dict[str, str] = {
+    recipe_type: f"Delicious {recipe_type.title()}"
+    for recipe_type in ("breakfast", "lunch", "dinner", "snack", "dessert")
+}
+_PLACEHOLDER_INGREDIENTS = ("ingredient1", "ingredient2", "ingredient3")
+_SHOPPING_LIST_CATEGORIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "proteins": ("chicken breast", "salmon", "tofu"),
+    "vegetables": ("broccoli", "spinach", "bell peppers"),
+    "grains": ("quinoa", "brown rice", "oats"),
+    "dairy": ("greek yogurt", "cheese", "milk")
+})
+_RECIPE_PER_SERVING: Mapping[str, int] = MappingProxyType({
+    "calories": 350,
+    "protein": 25,
+    "carbohydrates": 30,
+    "fat": 15,
+    "fiber": 8,
+    "sugar": 5,
+    "sodium": 400
+})
+_RECIPE_TOTAL_NUTRIENTS = ("calories", "protein", "carbohydrates", "fat")
+# Mock per-item values for food item analysis, one column per nutrient
+_FOOD_ITEM_NUTRIENTS = ("calories", "protein", "carbohydrates", "fat")
+_FOOD_ITEM_VALUES = np.array([100, 5, 15, 3], dtype=np.int64)
+_FOOD_ITEM_NUTRITION: Mapping[str, Any] = MappingProxyType({
+    **dict(zip(_FOOD_ITEM_NUTRIENTS, _FOOD_ITEM_VALUES.tolist())),
+    "serving_size": "100g"
+})
+_DETAILED_VITAMINS: Mapping[str, str] = MappingProxyType({
+    "vitamin_a": "15% DV",
+    "vitamin_c": "25% DV",
+    "calcium": "12% DV",
+    "iron": "18% DV"
+})
+_SAMPLE_ALLERGENS = ("gluten", "dairy")
+_ADDITIONAL_INGREDIENTS = ("salt", "pepper", "olive oil")
+_DEFAULT_INSTRUCTIONS = (
+    "Prepare all ingredients by washing and chopping as needed",
+    "Heat cooking surface to medium temperature",
+    "Combine main ingredients according to recipe requirements",
+    "Cook according to timing specifications",
+    "Season to taste and serve immediately"
+)
+_DEFAULT_TIPS = (
+    "Can be prepared ahead of time and reheated",
+    "Adjust seasoning to personal preference"
+)
+_GENERATED_RECIPE_NUTRITION: Mapping[str, int] = MappingProxyType({
+    "calories": 280,
+    "protein": 18,
+    "carbohydrates": 25,
+    "fat": 12,
+    "fiber": 6
+})
 
 
 class MiloMCPServer(BaseMCPServer):
@@ -21,218 +344,178 @@ class MiloMCPServer(BaseMCPServer):
     Provides meal planning, nutrition analysis, and recipe generation tools
     """
     
-    def __init__(self):
-        super().__init__(
-            server_name="milo",
-            port=8002,
-            description="Meal Planning & Nutrition Agent with AI-powered meal planning, nutritional analysis, and recipe generation"
-        )
-        
-        # Initialize tools
-        self.meal_planner = MealPlannerTool()
-        self.nutrition_analyzer = NutritionAnalyzerTool()
-        self.recipe_engine = RecipeEngineTool()
-    
-    async def initialize_agent(self):
-        """Initialize Milo's tools and resources"""
-        
-        # Register meal planning tool
-        self.register_tool(
+    TOOLS: Tuple[ToolSpec, ...] = (
+        ToolSpec(
             name="meal_planner",
             description="AI-powered meal planning with dietary restrictions and preferences",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "dietary_restrictions": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of dietary restrictions (vegetarian, vegan, gluten-free, etc.)"
-                    },
-                    "calories_target": {
-                        "type": "integer",
-                        "description": "Target daily calories"
-                    },
-                    "meals_per_day": {
-                        "type": "integer",
-                        "default": 3,
-                        "description": "Number of meals per day"
-                    },
-                    "days": {
-                        "type": "integer",
-                        "default": 7,
-                        "description": "Number of days to plan for"
-                    },
-                    "cuisine_preferences": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Preferred cuisines"
-                    },
-                    "exclude_ingredients": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Ingredients to exclude"
-                    }
-                },
-                "required": ["calories_target"]
-            },
-            function=self._plan_meals
-        )
-        
-        # Register nutrition analysis tool
-        self.register_tool(
+            input_schema=_MEAL_PLANNER_SCHEMA,
+            handler="_plan_meals"
+        ),
+        ToolSpec(
             name="nutrition_analyzer",
             description="Analyze nutritional content of meals and ingredients",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "food_items": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of food items to analyze"
-                    },
-                    "recipe": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                            "ingredients": {"type": "array", "items": {"type": "string"}},
-                            "servings": {"type": "integer"}
-                        },
-                        "description": "Recipe to analyze"
-                    },
-                    "analysis_type": {
-                        "type": "string",
-                        "enum": ["basic", "detailed", "macro_breakdown"],
-                        "default": "basic",
-                        "description": "Type of nutritional analysis"
-                    }
-                }
-            },
-            function=self._analyze_nutrition
-        )
-        
-        # Register recipe generation tool
-        self.register_tool(
+            input_schema=_NUTRITION_ANALYZER_SCHEMA,
+            handler="_analyze_nutrition"
+        ),
+        ToolSpec(
             name="recipe_generator",
             description="Generate and modify recipes based on ingredients and preferences",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "ingredients": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Available ingredients"
-                    },
-                    "recipe_type": {
-                        "type": "string",
-                        "enum": ["breakfast", "lunch", "dinner", "snack", "dessert"],
-                        "description": "Type of recipe to generate"
-                    },
-                    "cooking_time": {
-                        "type": "integer",
-                        "description": "Maximum cooking time in minutes"
-                    },
-                    "difficulty": {
-                        "type": "string",
-                        "enum": ["easy", "medium", "hard"],
-                        "default": "medium",
-                        "description": "Recipe difficulty level"
-                    },
-                    "dietary_requirements": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Dietary requirements to follow"
-                    },
-                    "cuisine_style": {
-                        "type": "string",
-                        "description": "Preferred cuisine style"
-                    }
-                },
-                "required": ["ingredients", "recipe_type"]
-            },
-            function=self._generate_recipe
-        )
-        
-        # Register meal optimization tool
-        self.register_tool(
+            input_schema=_RECIPE_GENERATOR_SCHEMA,
+            handler="_generate_recipe"
+        ),
+        ToolSpec(
             name="meal_optimizer",
             description="Optimize meal plans for nutrition, cost, and time efficiency",
-            input_schema={
-                "type": "object",
-                "properties": {
-                    "current_meal_plan": {
-                        "type": "object",
-                        "description": "Current meal plan to optimize"
-                    },
-                    "optimization_goals": {
-                        "type": "array",
-                        "items": {"type": "string", "enum": ["nutrition", "cost", "time", "variety"]},
-                        "description": "Optimization priorities"
-                    },
-                    "budget_constraint": {
-                        "type": "number",
-                        "description": "Budget constraint for the meal plan"
-                    },
-                    "prep_time_limit": {
-                        "type": "integer",
-                        "description": "Maximum preparation time per meal in minutes"
-                    }
-                },
-                "required": ["current_meal_plan", "optimization_goals"]
-            },
-            function=self._optimize_meals
+            input_schema=_MEAL_OPTIMIZER_SCHEMA,
+            handler="_optimize_meals"
         )
-        
-        # Register resources
-        self.register_resource(
+    )
+    
+    RESOURCES: Tuple[MCPResource, ...] = (
+        MCPResource(
             uri="milo://nutrition-database",
             name="Nutrition Database",
             description="Comprehensive nutrition information for foods and ingredients",
-            mime_type="application/json"
-        )
-        
-        self.register_resource(
-            uri="milo://recipe-database", 
+            mimeType="application/json"
+        ),
+        MCPResource(
+            uri="milo://recipe-database",
             name="Recipe Database",
             description="Collection of recipes with nutritional information",
-            mime_type="application/json"
-        )
-        
-        self.register_resource(
+            mimeType="application/json"
+        ),
+        MCPResource(
             uri="milo://dietary-guidelines",
             name="Dietary Guidelines",
             description="Nutritional guidelines and recommendations",
-            mime_type="text/markdown"
+            mimeType="text/markdown"
+        )
+    )
+    
+    def __init__(self):
+        super().__init__(
+            server_name="milo",
+            port=8002,
+            description="Meal Planning & Nutrition Agent with AI-powered meal planning, nutritional analysis, and recipe generation"
         )
         
-        self.logger.info("Milo MCP Server initialized with 4 tools and 3 resources")
+        # Input validators of the registered tools; the built-in tools share
+        # the module-level _TOOL_VALIDATORS
+        self._validators: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+        
+        # Tool name -> bound handler, used by _execute_tool
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+            spec.name: getattr(self, spec.handler) for spec in self.TOOLS
+        }
+        
+        # Unique, collision-free ids: a per-process prefix plus a counter
+        self._id_prefix = f"{time.monotonic_ns():x}"
+        self._id_counter = itertools.count(1)
+        
+        # Memoized analysis responses keyed by canonicalized arguments, stored
+        # as JSON bytes so every call decodes a fresh object that callers may
+        # mutate; only the timestamp is re-stamped on a hit. Plans and recipes
+        # are generated output and are never served from this cache.
+        self._response_cache = TTLStore(maxsize=512, ttl=3600)
+        self._cache_stats: Counter = Counter()
+    
+    # Tool classes are imported and built on first access; the mock MCP
+    # handlers below never touch them, so server start-up stays cheap
+    @cached_property
+    def meal_planner(self):
+        from agents.milo_nutrition.tools.meal_planner import MealPlannerTool
+        return MealPlannerTool()
+    
+    @cached_property
+    def nutrition_analyzer(self):
+        from agents.milo_nutrition.tools.nutrition_analyzer import NutritionAnalyzerTool
+        return NutritionAnalyzerTool()
+    
+    @cached_property
+    def recipe_engine(self):
+        from agents.milo_nutrition.tools.recipe_engine import RecipeEngineTool
+        return RecipeEngineTool()
+    
+    def register_tool(self, name: str, description: str, input_schema: Dict[str, Any],
+                     function: Optional[Callable] = None):
+        """Register a tool and compile its input schema into a validator"""
+        self._validators[name] = _compile_validator(input_schema)
+        super().register_tool(name, description, input_schema, function)
+    
+    async def initialize_agent(self):
+        """Initialize Milo's tools and resources"""
+        
+        self._validators.update(_TOOL_VALIDATORS)
+        self.register_tools_batch(
+            MCPTool(name=spec.name, description=spec.description, input_schema=spec.input_schema)
+            for spec in self.TOOLS
+        )
+        self.register_resources_batch(self.RESOURCES)
+        
+        self.logger.info(f"Milo MCP Server initialized with {len(self.TOOLS)} tools and {len(self.RESOURCES)} resources")
     
     async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Execute tool using legacy tool classes if function not provided"""
-        if tool_name == "meal_planner":
-            return await self._plan_meals(arguments)
-        elif tool_name == "nutrition_analyzer":
-            return await self._analyze_nutrition(arguments)
-        elif tool_name == "recipe_generator":
-            return await self._generate_recipe(arguments)
-        elif tool_name == "meal_optimizer":
-            return await self._optimize_meals(arguments)
-        else:
+        """Validate arguments against the precompiled schema, then execute the tool"""
+        # Names arrive freshly decoded from JSON; interning them lets the
+        # table lookups below match the literal keys by identity
+        tool_name = sys.intern(tool_name)
+        validator = self._validators.get(tool_name)
+        if validator is not None:
+            arguments = validator(arguments)
+        
+        handler = self._dispatch.get(tool_name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {tool_name}")
+        return await handler(arguments)
+    
+    def _next_id(self, kind: str) -> str:
+        """Return the next plan/recipe/optimization id"""
+        return f"{kind}_{self._id_prefix}_{next(self._id_counter)}"
+    
+    def _response_key(self, tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, bytes]:
+        """Build a cache key from the tool name and sorted-key JSON of its arguments"""
+        return (tool_name, json_dumps_bytes(arguments, sort_keys=True))
+    
+    def _store_response(self, key: Tuple[str, bytes], response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Memoize a tool response as serialized bytes and return its decoded form,
+        so a miss hands back the same shape as a later hit
+        """
+        payload = json_dumps_bytes(response)
+        self._response_cache[key] = payload
+        return json_loads_bytes(payload)
+    
+    def _lookup_response(self, key: Tuple[str, bytes]) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of a memoized tool response, recording the hit or miss"""
+        tool_name = key[0]
+        payload = self._response_cache.get(key)
+        response = json_loads_bytes(payload) if payload is not None else None
+        outcome = "hit" if response is not None else "miss"
+        self._cache_stats[tool_name, outcome] += 1
+        self.logger.debug(
+            "%s response cache %s (hits=%d, misses=%d)",
+            tool_name, outcome, self._cache_stats[tool_name, "hit"], self._cache_stats[tool_name, "miss"]
+        )
+        return response
     
     async def _plan_meals(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Plan meals based on dietary requirements"""
+        # Read the clock once; every day of the plan carries the same date
+        today = datetime.now().strftime("%Y-%m-%d")
+        plan_id = self._next_id("plan")
+        
         try:
-            # Extract parameters
-            calories_target = arguments.get("calories_target")
-            dietary_restrictions = arguments.get("dietary_restrictions", [])
-            meals_per_day = arguments.get("meals_per_day", 3)
-            days = arguments.get("days", 7)
-            cuisine_preferences = arguments.get("cuisine_preferences", [])
-            exclude_ingredients = arguments.get("exclude_ingredients", [])
+            # Extract parameters; the schema validator has already checked
+            # their shape, so the model is built without re-validating
+            args = MealPlannerArgs.model_construct(**arguments)
+            calories_target = args.calories_target
+            dietary_restrictions = args.dietary_restrictions
+            meals_per_day = args.meals_per_day
+            days = args.days
             
             # Generate meal plan (mock implementation)
             meal_plan = {
-                "plan_id": f"plan_{int(datetime.now().timestamp())}",
+                "plan_id": plan_id,
                 "target_calories": calories_target,
                 "dietary_restrictions": dietary_restrictions,
                 "duration_days": days,
@@ -240,54 +523,48 @@ class MiloMCPServer(BaseMCPServer):
                 "daily_plans": []
             }
             
-            # Generate daily meal plans
-            for day in range(days):
-                daily_plan = {
-                    "day": day + 1,
-                    "date": (datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).strftime("%Y-%m-%d")),
-                    "meals": [],
-                    "total_calories": 0,
-                    "macros": {"protein": 0, "carbs": 0, "fat": 0}
-                }
-                
-                # Distribute calories across meals
-                calories_per_meal = calories_target // meals_per_day
-                
-                meal_types = ["breakfast", "lunch", "dinner", "snack"][:meals_per_day]
-                
-                for i, meal_type in enumerate(meal_types):
-                    meal = {
-                        "meal_type": meal_type,
-                        "time": ["08:00", "12:00", "18:00", "15:00"][i],
-                        "recipes": [
-                            {
-                                "name": f"Healthy {meal_type.title()}",
-                                "ingredients": ["ingredient1", "ingredient2", "ingredient3"],
-                                "calories": calories_per_meal,
-                                "prep_time": 20,
-                                "difficulty": "medium",
-                                "macros": {
-                                    "protein": calories_per_meal * 0.2 // 4,
-                                    "carbs": calories_per_meal * 0.5 // 4,
-                                    "fat": calories_per_meal * 0.3 // 9
-                                }
-                            }
+            # Distribute calories across meals. Every day repeats the same
+            # meals, so the macros are computed once; each day still gets its
+            # own records, so editing one day never changes another
+            calories_per_meal = calories_target // meals_per_day
+            meal_macros = (
+                ("protein", calories_per_meal * 0.2 // 4),
+                ("carbs", calories_per_meal * 0.5 // 4),
+                ("fat", calories_per_meal * 0.3 // 9)
+            )
+            meal_slots = _MEAL_SLOTS[:meals_per_day]
+            
+            def day_meals() -> List[PlannedMeal]:
+                return [
+                    PlannedMeal(
+                        meal_type=meal_type,
+                        time=meal_time,
+                        recipes=[
+                            PlannedRecipe(
+                                name=recipe_name,
+                                ingredients=_PLACEHOLDER_INGREDIENTS,
+                                calories=calories_per_meal,
+                                prep_time=20,
+                                difficulty="medium",
+                                macros=dict(meal_macros)
+                            )
                         ],
-                        "total_calories": calories_per_meal
-                    }
-                    daily_plan["meals"].append(meal)
-                    daily_plan["total_calories"] += calories_per_meal
-                
-                meal_plan["daily_plans"].append(daily_plan)
+                        total_calories=calories_per_meal
+                    )
+                    for meal_type, meal_time, recipe_name in meal_slots
+                ]
+            
+            day_calories = calories_per_meal * len(meal_slots)
+            
+            # Generate daily meal plans
+            meal_plan["daily_plans"] = [
+                daily_plan
+                async for daily_plan in self._iter_daily_plans(days, today, day_meals, day_calories)
+            ]
             
             # Add shopping list
             meal_plan["shopping_list"] = {
-                "categories": {
-                    "proteins": ["chicken breast", "salmon", "tofu"],
-                    "vegetables": ["broccoli", "spinach", "bell peppers"],
-                    "grains": ["quinoa", "brown rice", "oats"],
-                    "dairy": ["greek yogurt", "cheese", "milk"]
-                },
+                "categories": dict(_SHOPPING_LIST_CATEGORIES),
                 "estimated_cost": calories_target * days * 0.002  # Mock cost calculation
             }
             
@@ -298,90 +575,81 @@ class MiloMCPServer(BaseMCPServer):
             }
             
         except Exception as e:
-            self.logger.error(f"Meal planning error: {e}")
+            self.logger.error("Meal planning error: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "message": "Failed to generate meal plan"
             }
     
+    async def _iter_daily_plans(self, days: int, today: str, day_meals: Callable[[], List[PlannedMeal]],
+                                day_calories: int) -> AsyncIterator[DailyPlan]:
+        """Yield daily plans, handing control back to the event loop periodically on long plans"""
+        cooperative = days > _COOPERATIVE_PLAN_DAYS
+        for day in range(days):
+            if cooperative and day and day % _COOPERATIVE_PLAN_DAYS == 0:
+                await asyncio.sleep(0)
+            yield DailyPlan(
+                day=day + 1,
+                date=today,
+                meals=day_meals(),
+                total_calories=day_calories,
+                macros={"protein": 0, "carbs": 0, "fat": 0}
+            )
+    
     async def _analyze_nutrition(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze nutritional content"""
+        key = self._response_key("nutrition_analyzer", arguments)
+        cached = self._lookup_response(key)
+        if cached is not None:
+            cached["timestamp"] = datetime.now().isoformat()
+            return cached
+        
         try:
-            food_items = arguments.get("food_items", [])
-            recipe = arguments.get("recipe")
-            analysis_type = arguments.get("analysis_type", "basic")
+            args = NutritionAnalyzerArgs.model_construct(**arguments)
+            food_items = args.food_items
+            recipe = args.recipe
+            analysis_type = sys.intern(args.analysis_type)
             
             if recipe:
                 # Analyze recipe
+                servings = recipe.get("servings", 1)
                 nutrition_analysis = {
                     "item_type": "recipe",
                     "name": recipe.get("name", "Unknown Recipe"),
-                    "servings": recipe.get("servings", 1),
-                    "per_serving": {
-                        "calories": 350,
-                        "protein": 25,
-                        "carbohydrates": 30,
-                        "fat": 15,
-                        "fiber": 8,
-                        "sugar": 5,
-                        "sodium": 400
-                    },
+                    "servings": servings,
+                    "per_serving": dict(_RECIPE_PER_SERVING),
                     "total": {
-                        "calories": 350 * recipe.get("servings", 1),
-                        "protein": 25 * recipe.get("servings", 1),
-                        "carbohydrates": 30 * recipe.get("servings", 1),
-                        "fat": 15 * recipe.get("servings", 1)
+                        nutrient: _RECIPE_PER_SERVING[nutrient] * servings
+                        for nutrient in _RECIPE_TOTAL_NUTRIENTS
                     }
                 }
                 
                 if analysis_type == "detailed":
-                    nutrition_analysis["vitamins"] = {
-                        "vitamin_a": "15% DV",
-                        "vitamin_c": "25% DV",
-                        "calcium": "12% DV",
-                        "iron": "18% DV"
-                    }
+                    nutrition_analysis["vitamins"] = dict(_DETAILED_VITAMINS)
                     nutrition_analysis["health_score"] = 8.5
-                    nutrition_analysis["allergens"] = ["gluten", "dairy"]
+                    nutrition_analysis["allergens"] = _SAMPLE_ALLERGENS
             
             else:
-                # Analyze food items
+                # Analyze food items; every item has the same mock values, so
+                # the totals are one vectorized multiply instead of a per-item sum
+                totals = _FOOD_ITEM_VALUES * len(food_items)
                 nutrition_analysis = {
                     "item_type": "food_items",
-                    "items": [],
-                    "total_nutrition": {
-                        "calories": 0,
-                        "protein": 0,
-                        "carbohydrates": 0,
-                        "fat": 0
-                    }
+                    "items": [{"name": item, **_FOOD_ITEM_NUTRITION} for item in food_items],
+                    "total_nutrition": dict(zip(_FOOD_ITEM_NUTRIENTS, totals.tolist()))
                 }
-                
-                for item in food_items:
-                    item_nutrition = {
-                        "name": item,
-                        "calories": 100,  # Mock values
-                        "protein": 5,
-                        "carbohydrates": 15,
-                        "fat": 3,
-                        "serving_size": "100g"
-                    }
-                    nutrition_analysis["items"].append(item_nutrition)
-                    
-                    # Add to totals
-                    for nutrient in ["calories", "protein", "carbohydrates", "fat"]:
-                        nutrition_analysis["total_nutrition"][nutrient] += item_nutrition[nutrient]
             
-            return {
+            response = {
                 "success": True,
                 "analysis": nutrition_analysis,
                 "analysis_type": analysis_type,
                 "timestamp": datetime.now().isoformat()
             }
+            return self._store_response(key, response)
             
         except Exception as e:
-            self.logger.error(f"Nutrition analysis error: {e}")
+            self.logger.error("Nutrition analysis error: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -390,18 +658,21 @@ class MiloMCPServer(BaseMCPServer):
     
     async def _generate_recipe(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Generate recipe from ingredients"""
+        recipe_id = self._next_id("recipe")
+        
         try:
-            ingredients = arguments.get("ingredients", [])
-            recipe_type = arguments.get("recipe_type")
-            cooking_time = arguments.get("cooking_time", 30)
-            difficulty = arguments.get("difficulty", "medium")
-            dietary_requirements = arguments.get("dietary_requirements", [])
-            cuisine_style = arguments.get("cuisine_style", "international")
+            args = RecipeGeneratorArgs.model_construct(**arguments)
+            ingredients = args.ingredients
+            recipe_type = args.recipe_type
+            cooking_time = args.cooking_time
+            difficulty = args.difficulty
+            dietary_requirements = args.dietary_requirements
+            cuisine_style = args.cuisine_style
             
             # Generate recipe (mock implementation)
             recipe = {
-                "id": f"recipe_{int(datetime.now().timestamp())}",
-                "name": f"Delicious {recipe_type.title()}",
+                "id": recipe_id,
+                "name": _GENERATED_RECIPE_NAMES.get(recipe_type) or f"Delicious {recipe_type.title()}",
                 "description": f"A {difficulty} {cuisine_style} {recipe_type} made with available ingredients",
                 "cuisine": cuisine_style,
                 "recipe_type": recipe_type,
@@ -416,25 +687,12 @@ class MiloMCPServer(BaseMCPServer):
                     "allergens": []
                 },
                 "ingredients_used": ingredients[:6],  # Use up to 6 ingredients
-                "additional_ingredients": ["salt", "pepper", "olive oil"],
-                "instructions": [
-                    "Prepare all ingredients by washing and chopping as needed",
-                    "Heat cooking surface to medium temperature",
-                    "Combine main ingredients according to recipe requirements",
-                    "Cook according to timing specifications",
-                    "Season to taste and serve immediately"
-                ],
-                "nutrition": {
-                    "calories": 280,
-                    "protein": 18,
-                    "carbohydrates": 25,
-                    "fat": 12,
-                    "fiber": 6
-                },
+                "additional_ingredients": _ADDITIONAL_INGREDIENTS,
+                "instructions": _DEFAULT_INSTRUCTIONS,
+                "nutrition": dict(_GENERATED_RECIPE_NUTRITION),
                 "tips": [
                     f"This recipe works best with fresh {ingredients[0] if ingredients else 'ingredients'}",
-                    "Can be prepared ahead of time and reheated",
-                    "Adjust seasoning to personal preference"
+                    *_DEFAULT_TIPS
                 ]
             }
             
@@ -447,7 +705,7 @@ class MiloMCPServer(BaseMCPServer):
             }
             
         except Exception as e:
-            self.logger.error(f"Recipe generation error: {e}")
+            self.logger.error("Recipe generation error: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -457,37 +715,30 @@ class MiloMCPServer(BaseMCPServer):
     async def _optimize_meals(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize meal plans"""
         try:
-            current_meal_plan = arguments.get("current_meal_plan", {})
-            optimization_goals = arguments.get("optimization_goals", [])
-            budget_constraint = arguments.get("budget_constraint")
-            prep_time_limit = arguments.get("prep_time_limit")
+            args = MealOptimizerArgs.model_construct(**arguments)
+            current_meal_plan = args.current_meal_plan
+            optimization_goals = args.optimization_goals
             
             optimizations_applied = []
-            optimized_plan = current_meal_plan.copy()
-            
-            # Apply optimizations based on goals
-            if "cost" in optimization_goals and budget_constraint:
-                optimizations_applied.append("Reduced ingredient costs by substituting premium items")
-                optimized_plan["estimated_cost"] = min(
-                    current_meal_plan.get("estimated_cost", 100),
-                    budget_constraint
-                )
-            
-            if "time" in optimization_goals and prep_time_limit:
-                optimizations_applied.append("Simplified recipes to meet time constraints")
-                optimized_plan["avg_prep_time"] = min(30, prep_time_limit)
+            # Updates collect in a small overlay; the incoming plan, which
+            # may be large, is only merged into a new dict if anything changed
+            plan_updates: Dict[str, Any] = {}
             
-            if "nutrition" in optimization_goals:
-                optimizations_applied.append("Balanced macronutrients and increased vegetable content")
-                optimized_plan["nutrition_score"] = 9.2
+            # Goals are cheap, synchronous steps; apply them in a fixed goal order
+            for goal in _OPTIMIZATION_GOALS:
+                if goal not in optimization_goals:
+                    continue
+                outcome = self._apply_goal(goal, args)
+                if outcome is not None:
+                    note, updates = outcome
+                    optimizations_applied.append(note)
+                    plan_updates.update(updates)
             
-            if "variety" in optimization_goals:
-                optimizations_applied.append("Increased cuisine diversity and ingredient rotation")
-                optimized_plan["cuisine_diversity"] = 85
+            optimized_plan = {**current_meal_plan, **plan_updates} if plan_updates else current_meal_plan
             
             optimization_summary = {
                 "original_plan_id": current_meal_plan.get("plan_id", "unknown"),
-                "optimized_plan_id": f"opt_{int(datetime.now().timestamp())}",
+                "optimized_plan_id": self._next_id("opt"),
                 "optimization_goals": optimization_goals,
                 "optimizations_applied": optimizations_applied,
                 "improvements": {
@@ -506,57 +757,46 @@ class MiloMCPServer(BaseMCPServer):
             }
             
         except Exception as e:
-            self.logger.error(f"Meal optimization error: {e}")
+            self.logger.error("Meal optimization error: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "message": "Failed to optimize meal plan"
             }
     
-    async def _read_resource(self, uri: str) -> str:
-        """Read resource content"""
-        if uri == "milo://nutrition-database":
-            return json.dumps({
-                "database": "USDA Food Database",
-                "foods_count": 15000,
-                "last_updated": "2025-08-10",
-                "sample_foods": [
-                    {"name": "Apple", "calories_per_100g": 52, "nutrients": {"vitamin_c": 4.6}},
-                    {"name": "Chicken Breast", "calories_per_100g": 165, "nutrients": {"protein": 31}}
-                ]
-            }, indent=2)
-        
-        elif uri == "milo://recipe-database":
-            return json.dumps({
-                "recipes_count": 5000,
-                "categories": ["breakfast", "lunch", "dinner", "snacks", "desserts"],
-                "sample_recipes": [
-                    {"name": "Quinoa Buddha Bowl", "calories": 380, "prep_time": 25},
-                    {"name": "Grilled Salmon", "calories": 290, "prep_time": 15}
-                ]
-            }, indent=2)
-        
-        elif uri == "milo://dietary-guidelines":
-            return """# Dietary Guidelines
+    def _apply_goal(self, goal: str, args: MealOptimizerArgs) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return the note and plan updates for one optimization goal, or None if it does not apply"""
+        if goal == "cost":
+            if args.budget_constraint:
+                return "Reduced ingredient costs by substituting premium items", {
+                    "estimated_cost": min(
+                        args.current_meal_plan.get("estimated_cost", 100),
+                        args.budget_constraint
+                    )
+                }
+        elif goal == "time":
+            if args.prep_time_limit:
+                return "Simplified recipes to meet time constraints", {
+                    "avg_prep_time": min(30, args.prep_time_limit)
+                }
+        elif goal == "nutrition":
+            return "Balanced macronutrients and increased vegetable content", {"nutrition_score": 9.2}
+        elif goal == "variety":
+            return "Increased cuisine diversity and ingredient rotation", {"cuisine_diversity": 85}
+        return None
+    
+    async def _read_resource(self, uri: str) -> bytes:
+        """Read resource content as UTF-8 bytes"""
+        try:
+            return _RESOURCE_CONTENTS[uri]
+        except KeyError:
+            raise ValueError(f"Unknown resource: {uri}") from None
 
-## Daily Caloric Needs
-- Adult Women: 1800-2400 calories
-- Adult Men: 2200-3000 calories
 
-## Macronutrient Distribution
-- Carbohydrates: 45-65% of total calories
-- Protein: 10-35% of total calories  
-- Fat: 20-35% of total calories
-
-## Key Recommendations
-- Include variety of vegetables and fruits
-- Choose whole grains over refined grains
-- Include lean proteins and healthy fats
-- Limit added sugars and sodium
-"""
-        
-        else:
-            raise ValueError(f"Unknown resource: {uri}")
+# Built-in tool name -> input validator, compiled once at import
+_TOOL_VALIDATORS: Final[Mapping[str, Callable[[Dict[str, Any]], Dict[str, Any]]]] = MappingProxyType({
+    spec.name: _compile_validator(spec.input_schema) for spec in MiloMCPServer.TOOLS
+})
 
 
 async def main():
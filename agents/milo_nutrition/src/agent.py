@@ -3,93 +3,316 @@ Agent Milo - Core Agent Implementation
 Meal Planning & Nutrition Agent
 """
 
+import asyncio
+import heapq
+import importlib.util
+import os
+import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING, Callable, Collection, Dict, Final, FrozenSet, Iterable, Iterator, List, Any, Mapping, Optional,
+    Set, Tuple
+)
 
-from shared.mcp_framework.base_server import BaseMCPServer, ExecutionContext
-from shared.a2a_protocol.message_router import A2AMessage
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+from shared.mcp_framework.base_server import BaseMCPServer, BaseMCPTool, ExecutionContext, ExecutionResult
+from shared.a2a_protocol.message_router import A2AMessage, decode_a2a_message
 
 # Import Milo's tools
-from agents.milo_nutrition.tools.recipe_engine import RecipeEngineTool
-from agents.milo_nutrition.tools.nutrition_analyzer import NutritionAnalyzerTool
-from agents.milo_nutrition.tools.meal_planner import MealPlannerTool
+from agents.milo_nutrition import tools as milo_tools
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Keyword found anywhere in a day's meals -> batch cooking suggestion
+_BATCH_COOKING_KEYWORDS = {
+    "rice": "Cook rice in large batch",
+    "chicken": "Prep chicken proteins together"
+}
+
+# Cooking-method keyword found anywhere in the meal plan -> extra equipment
+_EQUIPMENT_TRIGGERS = {
+    "bake": "baking_sheets",
+    "stir": "wok_or_large_pan",
+    "roast": "roasting_pan",
+    "fry": "skillet"
+}
+
+# One alternation over every trigger, so the plan text is swept once; the
+# lookahead lets overlapping triggers (e.g. "stiroast") all be reported
+_EQUIPMENT_TRIGGER_RE = re.compile("(?=(%s))" % "|".join(map(re.escape, _EQUIPMENT_TRIGGERS)))
+
+# Static prep guidance returned with every prep schedule; read-only and
+# expanded into plain copies for each response
+_BATCH_COOKING_SCHEDULE: Final[Mapping[str, Any]] = MappingProxyType({
+    "sunday_batch_prep": MappingProxyType({
+        "time": "14:00-16:00",
+        "tasks": ("Cook grains", "Prep proteins", "Wash and chop vegetables"),
+        "estimated_time": 120
+    }),
+    "mid_week_prep": MappingProxyType({
+        "time": "wednesday 18:00",
+        "tasks": ("Refresh vegetables", "Quick protein prep"),
+        "estimated_time": 30
+    })
+})
+
+_TIME_SAVINGS: Final[Tuple[str, ...]] = (
+    "Batch cook grains and proteins on Sunday",
+    "Pre-chop vegetables for the week",
+    "Use slow cooker for hands-off cooking",
+    "Prepare overnight oats for quick breakfasts"
+)
+
+# Goal alignment evaluators: each scores one fitness goal against the nutrition data
+_MUSCLE_GAIN_FACTORS = ("protein_intake", "calorie_surplus", "meal_timing")
+_WEIGHT_LOSS_FACTORS = ("calorie_deficit", "protein_preservation", "nutrient_density")
+
+def _eval_muscle_gain(nutrition_data: Dict) -> Dict[str, Any]:
+    protein_adequate = nutrition_data.get("protein_grams", 0) > 100
+    return {"score": 0.9 if protein_adequate else 0.6, "key_factors": _MUSCLE_GAIN_FACTORS}
+
+def _eval_weight_loss(nutrition_data: Dict) -> Dict[str, Any]:
+    calorie_deficit = nutrition_data.get("daily_calories", 2000) < 1800
+    return {"score": 0.85 if calorie_deficit else 0.5, "key_factors": _WEIGHT_LOSS_FACTORS}
+
+_GOAL_RULES: Final[Mapping[str, Callable[[Dict], Dict[str, Any]]]] = MappingProxyType({
+    "muscle_gain": _eval_muscle_gain,
+    "weight_loss": _eval_weight_loss
+})
+
+# Meal timing recommendations; read-only because cached results share them
+_GENERAL_MEAL_TIMING = MappingProxyType({
+    "breakfast": "7:00-9:00",
+    "lunch": "12:00-14:00",
+    "dinner": "18:00-20:00",
+    "snacks": ("10:00", "15:00")
+})
+
+_GOAL_MEAL_TIMING = (
+    ("muscle_gain", MappingProxyType({
+        "pre_workout": "30-60 minutes before training",
+        "post_workout": "within 30 minutes after training",
+        "protein_frequency": "every 3-4 hours",
+        "evening_protein": "casein protein before bed"
+    })),
+    ("endurance", MappingProxyType({
+        "pre_workout": "2-3 hours before long sessions",
+        "during_workout": "carbs every 45-60 minutes",
+        "post_workout": "carbs and protein within 2 hours",
+        "hydration": "continuous throughout day"
+    }))
+)
+
+def _expiry_matcher(expiring_items: List[str]) -> Callable[[str], Collection[str]]:
+    """Return a callable mapping a lowercased ingredient to the expiring items it mentions"""
+    if AHOCORASICK_AVAILABLE:
+        by_pattern: Dict[str, List[str]] = {}
+        for item in expiring_items:
+            by_pattern.setdefault(item.lower(), []).append(item)
+        # An empty item is a substring of every ingredient, and the automaton rejects it
+        always = tuple(by_pattern.pop("", ()))
+        
+        if by_pattern:
+            automaton = ahocorasick.Automaton()
+            for pattern, items in by_pattern.items():
+                automaton.add_word(pattern, tuple(items))
+            automaton.make_automaton()
+            
+            def match(ingredient_lc: str) -> Collection[str]:
+                hits = set(always)
+                for _, items in automaton.iter(ingredient_lc):
+                    hits.update(items)
+                return hits
+            
+            return match
+    
+    items_lc = [(item, item.lower()) for item in expiring_items]
+    return lambda ingredient_lc: [item for item, item_lc in items_lc if item_lc in ingredient_lc]
+
+def _iter_days(meal_plan: Any) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (day, meals) pairs from a meal plan given as a dict or as an
+    iterable of [day, meals] pairs. Plans come from A2A payloads, so strings
+    are rejected rather than treated as anything the server could open.
+    """
+    if isinstance(meal_plan, Mapping):
+        yield from meal_plan.items()
+    elif isinstance(meal_plan, (str, bytes, os.PathLike)):
+        raise ValueError("meal_plan must be an object or a list of [day, meals] pairs")
+    else:
+        yield from meal_plan
+
+_EXPIRY_SCORE = itemgetter("expiry_priority_score")
+
+def _thaw(value: Any) -> Any:
+    """JSON-ready copy of a read-only constant: mappings become dicts and tuples lists"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+# Nutritional gap -> suggested meal adjustment; read-only, copied into responses
+_ADJUSTMENT_TABLE: Final[Mapping[str, Mapping[str, str]]] = MappingProxyType({
+    "insufficient_protein": MappingProxyType({
+        "issue": "Low protein intake",
+        "suggestion": "Add Greek yogurt to breakfast and legumes to lunch",
+        "impact": "Increase daily protein by 20g"
+    }),
+    "low_fiber": MappingProxyType({
+        "issue": "Insufficient fiber",
+        "suggestion": "Include more vegetables and whole grains",
+        "impact": "Improve digestive health and satiety"
+    })
+})
+
+# Tool name -> class exported by agents.milo_nutrition.tools
+_TOOL_CLASSES: Final[Mapping[str, str]] = MappingProxyType({
+    "recipe_engine": "RecipeEngineTool",
+    "nutrition_analyzer": "NutritionAnalyzerTool",
+    "meal_planner": "MealPlannerTool"
+})
+
+# Permission sets handed to tools; tuples so cached contexts stay immutable
+_READ_WRITE = ("read", "write")
+_READ_ONLY = ("read",)
+
+@lru_cache(maxsize=1024)
+def _execution_context(user_id: str, session_id: str, permissions: Tuple[str, ...]) -> ExecutionContext:
+    """Shared per-session tool context; ExecutionContext is frozen, so reuse is safe"""
+    return ExecutionContext(user_id=user_id, session_id=session_id, permissions=permissions)
+
+# Below this many recipes, encoding for the compiled kernel costs more than it saves.
+# scoring_kernel compiles at import, so it is only imported once a corpus this
+# large arrives; until then just check that Numba is installed.
+_KERNEL_MIN_RECIPES = 256
+_NUMBA_INSTALLED = importlib.util.find_spec("numba") is not None
+
+@lru_cache(maxsize=64)
+def _meal_timing(fitness_goals: FrozenSet[str]) -> Mapping[str, Any]:
+    """Build the meal timing recommendations for one combination of goals"""
+    timing_recommendations = {"general": _GENERAL_MEAL_TIMING}
+    for goal, timing in _GOAL_MEAL_TIMING:
+        if goal in fitness_goals:
+            timing_recommendations[goal] = timing
+    return MappingProxyType(timing_recommendations)
 
 class MiloAgent(BaseMCPServer):
     """Agent Milo - Meal Planning & Nutrition"""
     
+    # Shared failure template; handlers spread it and fill in the error
+    _ERROR_RESPONSE: Mapping[str, Any] = MappingProxyType({"success": False, "error": None, "agent": "milo"})
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__("milo", 8003, config)
         
-        # Register all Milo's tools
-        self.register_tool(RecipeEngineTool())
-        self.register_tool(NutritionAnalyzerTool())
-        self.register_tool(MealPlannerTool())
+        # Tools are imported and registered on first use (see get_tool); they
+        # share the caller's HTTP pool when given one
+        self._shared_http = config.get("shared_http")
+        
+        # Intent -> bound handler for process_a2a_message
+        self._intent_handlers = {
+            "create_meal_plan": self._create_meal_plan,
+            "analyze_nutrition_goals": self._analyze_nutrition_for_goals,
+            "find_recipes_with_ingredients": self._find_recipes_for_ingredients,
+            "optimize_meal_prep": self._optimize_meal_prep_schedule,
+            "evaluate_dietary_compliance": self._evaluate_dietary_compliance
+        }
+        
+        # Cap concurrent tool calls across all in-flight A2A requests
+        max_tool_calls = config.get("performance", {}).get("max_concurrent_tool_calls", 8)
+        self._tool_semaphore = asyncio.Semaphore(max_tool_calls)
         
-        self.logger.info("Agent Milo initialized with 3 tools")
+        self.logger.info(f"Agent Milo initialized with {len(_TOOL_CLASSES)} tools")
     
     async def process_a2a_message(self, message_data: dict) -> Dict[str, Any]:
         """Process incoming A2A messages from other agents"""
         try:
-            message = A2AMessage(**message_data)
+            message = decode_a2a_message(message_data)
             self.logger.info(f"Milo received: {message.intent} from {message.from_agent}")
             
-            if message.intent == "create_meal_plan":
-                return await self._create_meal_plan(message)
-            elif message.intent == "analyze_nutrition_goals":
-                return await self._analyze_nutrition_for_goals(message)
-            elif message.intent == "find_recipes_with_ingredients":
-                return await self._find_recipes_for_ingredients(message)
-            elif message.intent == "optimize_meal_prep":
-                return await self._optimize_meal_prep_schedule(message)
-            elif message.intent == "evaluate_dietary_compliance":
-                return await self._evaluate_dietary_compliance(message)
+            handler = self._intent_handlers.get(message.intent)
+            if handler is not None:
+                return await handler(message)
             else:
-                return {
-                    "success": False, 
-                    "error": f"Unknown intent: {message.intent}",
-                    "agent": "milo"
-                }
+                return {**self._ERROR_RESPONSE, "error": f"Unknown intent: {message.intent}"}
                 
         except Exception as e:
             self.logger.error(f"A2A message processing failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "milo"
-            }
+            return {**self._ERROR_RESPONSE, "error": str(e)}
+    
+    def get_tool(self, tool_name: str) -> Optional[BaseMCPTool]:
+        """Look up a tool, importing and registering it the first time it is needed"""
+        tool = self.tools.get(tool_name)
+        if tool is None and tool_name in _TOOL_CLASSES:
+            tool = getattr(milo_tools, _TOOL_CLASSES[tool_name])(http=self._shared_http)
+            self.register_tool(tool)
+        return tool
+    
+    def tool_names(self) -> List[str]:
+        return list(_TOOL_CLASSES)
+    
+    async def _run_tool(self, tool_name: str, params: Dict[str, Any], context: ExecutionContext) -> ExecutionResult:
+        """Execute a tool under the agent-wide concurrency cap"""
+        async with self._tool_semaphore:
+            return await self.get_tool(tool_name).execute(params, context)
     
     async def _create_meal_plan(self, message: A2AMessage) -> Dict[str, Any]:
         """Create a comprehensive meal plan based on requirements"""
         payload = message.payload
+        dietary_goals = payload.get("dietary_goals", {})
+        available_ingredients = payload.get("available_ingredients", [])
         
-        meal_planner_tool = self.tools["meal_planner"]
-        context = ExecutionContext(
-            user_id=payload.get("user_id", "default"),
-            session_id=message.session_id,
-            permissions=["read", "write"]
-        )
+        context = _execution_context(payload.get("user_id", "default"), message.session_id, _READ_WRITE)
         
         # Create meal plan with provided parameters
-        meal_plan_result = await meal_planner_tool.execute({
+        meal_plan_call = self._run_tool("meal_planner", {
             "action": "create_weekly_plan",
-            "dietary_goals": payload.get("dietary_goals", {}),
-            "available_ingredients": payload.get("available_ingredients", []),
+            "dietary_goals": dietary_goals,
+            "available_ingredients": available_ingredients,
             "budget_constraint": payload.get("budget_constraint", 100),
             "time_constraints": payload.get("time_constraints", {}),
             "family_preferences": payload.get("family_preferences", {})
         }, context)
         
+        # With both goals and ingredients, look up matching recipes alongside
+        # the plan instead of after it
+        recipe_result = None
+        if dietary_goals and available_ingredients:
+            meal_plan_result, recipe_result = await asyncio.gather(
+                meal_plan_call,
+                self._run_tool("recipe_engine", {
+                    "action": "find_recipes",
+                    "available_ingredients": available_ingredients,
+                    "dietary_restrictions": payload.get("dietary_restrictions", [])
+                }, context)
+            )
+        else:
+            meal_plan_result = await meal_plan_call
+        
         if meal_plan_result.success:
-            return {
+            response = {
                 "success": True,
                 "meal_plan": meal_plan_result.result["meal_plan"],
                 "nutrition_summary": meal_plan_result.result.get("nutrition_summary", {}),
                 "shopping_list": meal_plan_result.result.get("shopping_list", []),
-                "prep_schedule": meal_plan_result.result.get("prep_schedule", {}),
-                "agent": "milo"
+                "prep_schedule": meal_plan_result.result.get("prep_schedule", {})
             }
+            if recipe_result is not None and recipe_result.success:
+                response["recipe_suggestions"] = recipe_result.result.get("recipes", [])
+            response["agent"] = "milo"
+            return response
         else:
-            return {"success": False, "error": meal_plan_result.error, "agent": "milo"}
+            return {**self._ERROR_RESPONSE, "error": meal_plan_result.error}
     
     async def _analyze_nutrition_for_goals(self, message: A2AMessage) -> Dict[str, Any]:
         """Analyze nutrition requirements for specific fitness/health goals"""
@@ -97,15 +320,10 @@ class MiloAgent(BaseMCPServer):
         fitness_goals = payload.get("fitness_goals", [])
         current_metrics = payload.get("current_metrics", {})
         
-        nutrition_analyzer = self.tools["nutrition_analyzer"]
-        context = ExecutionContext(
-            user_id=payload.get("user_id", "default"),
-            session_id=message.session_id,
-            permissions=["read"]
-        )
+        context = _execution_context(payload.get("user_id", "default"), message.session_id, _READ_ONLY)
         
         # Analyze nutrition needs based on goals
-        analysis_result = await nutrition_analyzer.execute({
+        analysis_result = await self._run_tool("nutrition_analyzer", {
             "action": "calculate_requirements",
             "fitness_goals": fitness_goals,
             "current_metrics": current_metrics,
@@ -122,7 +340,7 @@ class MiloAgent(BaseMCPServer):
                 "agent": "milo"
             }
         else:
-            return {"success": False, "error": analysis_result.error, "agent": "milo"}
+            return {**self._ERROR_RESPONSE, "error": analysis_result.error}
     
     async def _find_recipes_for_ingredients(self, message: A2AMessage) -> Dict[str, Any]:
         """Find recipes based on available ingredients"""
@@ -130,17 +348,12 @@ class MiloAgent(BaseMCPServer):
         available_ingredients = payload.get("available_ingredients", [])
         expiring_items = payload.get("expiring_items", [])
         
-        recipe_engine = self.tools["recipe_engine"]
-        context = ExecutionContext(
-            user_id=payload.get("user_id", "default"),
-            session_id=message.session_id,
-            permissions=["read"]
-        )
+        context = _execution_context(payload.get("user_id", "default"), message.session_id, _READ_ONLY)
         
         # Prioritize recipes using expiring ingredients
         search_ingredients = expiring_items + available_ingredients
         
-        recipe_result = await recipe_engine.execute({
+        recipe_result = await self._run_tool("recipe_engine", {
             "action": "find_recipes",
             "available_ingredients": search_ingredients,
             "dietary_restrictions": payload.get("dietary_restrictions", []),
@@ -152,17 +365,17 @@ class MiloAgent(BaseMCPServer):
         if recipe_result.success:
             recipes = recipe_result.result["recipes"]
             # Prioritize recipes that use expiring ingredients
-            prioritized_recipes = self._prioritize_recipes_by_expiry(recipes, expiring_items)
+            prioritized_recipes, expiry_usage = self._score_recipes_against_expiring(recipes, expiring_items)
             
             return {
                 "success": True,
                 "recipes": prioritized_recipes,
-                "expiring_ingredient_usage": self._calculate_expiry_usage(recipes, expiring_items),
+                "expiring_ingredient_usage": expiry_usage,
                 "meal_suggestions": self._suggest_meals_from_recipes(prioritized_recipes),
                 "agent": "milo"
             }
         else:
-            return {"success": False, "error": recipe_result.error, "agent": "milo"}
+            return {**self._ERROR_RESPONSE, "error": recipe_result.error}
     
     async def _optimize_meal_prep_schedule(self, message: A2AMessage) -> Dict[str, Any]:
         """Optimize meal prep schedule with Nani's calendar coordination"""
@@ -170,23 +383,32 @@ class MiloAgent(BaseMCPServer):
         meal_plan = payload.get("meal_plan", {})
         available_time_slots = payload.get("available_time_slots", [])
         
+        # Walk the plan one day at a time, keeping only per-day summaries
+        days = []
+        prep_rows = []
+        batch_opportunities = []
+        equipment_triggers = set()
+        for day, meals in _iter_days(meal_plan):
+            if isinstance(meals, dict):
+                days.append(day)
+                prep_rows.append([
+                    meal_info.get("prep_time", 15) if isinstance(meal_info, dict) else 15
+                    for meal_info in meals.values()
+                ])
+                batch_opportunities.append(self._identify_batch_cooking(meals))
+                equipment_triggers |= self._find_equipment_triggers(meals)
+        
         # Calculate prep time requirements
-        prep_schedule = {}
-        total_prep_time = 0
+        day_totals = self._prep_time_grid(prep_rows).sum(axis=1)
+        total_prep_time = day_totals.sum().item()
         
-        for day, meals in meal_plan.items():
-            if isinstance(meals, dict):
-                day_prep_time = 0
-                for meal_type, meal_info in meals.items():
-                    prep_time = meal_info.get("prep_time", 15) if isinstance(meal_info, dict) else 15
-                    day_prep_time += prep_time
-                
-                prep_schedule[day] = {
-                    "total_prep_time": day_prep_time,
-                    "recommended_prep_time": self._suggest_prep_time(day, day_prep_time),
-                    "batch_opportunities": self._identify_batch_cooking(meals)
-                }
-                total_prep_time += day_prep_time
+        prep_schedule = {}
+        for day, day_prep_time, opportunities in zip(days, day_totals.tolist(), batch_opportunities):
+            prep_schedule[day] = {
+                "total_prep_time": day_prep_time,
+                "recommended_prep_time": self._suggest_prep_time(day, day_prep_time),
+                "batch_opportunities": opportunities
+            }
         
         # Optimize for batch cooking
         batch_schedule = self._create_batch_cooking_schedule(prep_schedule)
@@ -197,26 +419,38 @@ class MiloAgent(BaseMCPServer):
             "batch_cooking_plan": batch_schedule,
             "total_weekly_prep_time": total_prep_time,
             "time_saving_opportunities": self._identify_time_savings(prep_schedule),
-            "kitchen_equipment_needs": self._assess_equipment_needs(meal_plan),
+            "kitchen_equipment_needs": self._assess_equipment_needs(equipment_triggers),
             "agent": "milo"
         }
     
+    def _prep_time_grid(self, rows: List[List[Any]]) -> "np.ndarray":
+        """Pack per-day prep minutes into a (days x meals) grid"""
+        import numpy as np
+        
+        # Days can hold different numbers of meals; pad the grid with zeros
+        width = max(map(len, rows), default=0)
+        values = [prep_time for row in rows for prep_time in row]
+        flat = np.asarray(values) if values else np.zeros(0, dtype=np.int64)
+        grid = np.zeros((len(rows), width), dtype=flat.dtype)
+        row_index = np.repeat(np.arange(len(rows)), [len(row) for row in rows])
+        col_index = np.concatenate([np.arange(len(row)) for row in rows]) if rows else row_index
+        grid[row_index, col_index] = flat
+        return grid
+    
     async def _evaluate_dietary_compliance(self, message: A2AMessage) -> Dict[str, Any]:
         """Evaluate how well current meal plan meets dietary goals"""
         payload = message.payload
         meal_plan = payload.get("meal_plan", {})
+        if not isinstance(meal_plan, Mapping):
+            # The analyzer tool takes the plan as a whole
+            meal_plan = dict(_iter_days(meal_plan))
         dietary_goals = payload.get("dietary_goals", {})
         health_targets = payload.get("health_targets", {})
         
-        nutrition_analyzer = self.tools["nutrition_analyzer"]
-        context = ExecutionContext(
-            user_id=payload.get("user_id", "default"),
-            session_id=message.session_id,
-            permissions=["read"]
-        )
+        context = _execution_context(payload.get("user_id", "default"), message.session_id, _READ_ONLY)
         
         # Analyze current meal plan compliance
-        compliance_result = await nutrition_analyzer.execute({
+        compliance_result = await self._run_tool("nutrition_analyzer", {
             "action": "evaluate_compliance",
             "meal_plan": meal_plan,
             "dietary_goals": dietary_goals,
@@ -236,26 +470,16 @@ class MiloAgent(BaseMCPServer):
                 "agent": "milo"
             }
         else:
-            return {"success": False, "error": compliance_result.error, "agent": "milo"}
+            return {**self._ERROR_RESPONSE, "error": compliance_result.error}
     
     def _assess_goal_alignment(self, fitness_goals: List[str], nutrition_data: Dict) -> Dict[str, Any]:
         """Assess how well nutrition plan aligns with fitness goals"""
         alignment_score = 0.8  # Mock calculation
         
-        alignment_details = {}
-        for goal in fitness_goals:
-            if goal == "muscle_gain":
-                protein_adequate = nutrition_data.get("protein_grams", 0) > 100
-                alignment_details[goal] = {
-                    "score": 0.9 if protein_adequate else 0.6,
-                    "key_factors": ["protein_intake", "calorie_surplus", "meal_timing"]
-                }
-            elif goal == "weight_loss":
-                calorie_deficit = nutrition_data.get("daily_calories", 2000) < 1800
-                alignment_details[goal] = {
-                    "score": 0.85 if calorie_deficit else 0.5,
-                    "key_factors": ["calorie_deficit", "protein_preservation", "nutrient_density"]
-                }
+        alignment_details = {
+            goal: _GOAL_RULES[goal](nutrition_data)
+            for goal in fitness_goals if goal in _GOAL_RULES
+        }
         
         return {
             "overall_alignment": alignment_score,
@@ -265,67 +489,75 @@ class MiloAgent(BaseMCPServer):
     
     def _get_meal_timing_for_goals(self, fitness_goals: List[str]) -> Dict[str, Any]:
         """Get meal timing recommendations based on fitness goals"""
-        timing_recommendations = {
-            "general": {
-                "breakfast": "7:00-9:00",
-                "lunch": "12:00-14:00",
-                "dinner": "18:00-20:00",
-                "snacks": ["10:00", "15:00"]
-            }
-        }
-        
-        if "muscle_gain" in fitness_goals:
-            timing_recommendations["muscle_gain"] = {
-                "pre_workout": "30-60 minutes before training",
-                "post_workout": "within 30 minutes after training",
-                "protein_frequency": "every 3-4 hours",
-                "evening_protein": "casein protein before bed"
-            }
-        
-        if "endurance" in fitness_goals:
-            timing_recommendations["endurance"] = {
-                "pre_workout": "2-3 hours before long sessions",
-                "during_workout": "carbs every 45-60 minutes",
-                "post_workout": "carbs and protein within 2 hours",
-                "hydration": "continuous throughout day"
-            }
-        
-        return timing_recommendations
+        return _thaw(_meal_timing(frozenset(fitness_goals)))
     
-    def _prioritize_recipes_by_expiry(self, recipes: List[Dict], expiring_items: List[str]) -> List[Dict]:
-        """Prioritize recipes that use expiring ingredients"""
-        prioritized = []
+    def _score_recipes_against_expiring(self, recipes: List[Dict], expiring_items: List[str],
+                                        top_k: Optional[int] = None) -> Tuple[List[Dict], Dict[str, Any]]:
+        """
+        Rank recipes by expiring-ingredient use and tally per-item usage in a single pass.
+        With top_k, only the top_k highest-scoring recipes are returned.
+        """
+        if len(recipes) >= _KERNEL_MIN_RECIPES and _NUMBA_INSTALLED:
+            from agents.milo_nutrition.src import scoring_kernel
+            if scoring_kernel.NUMBA_AVAILABLE:
+                return self._score_recipes_with_kernel(recipes, expiring_items, top_k)
+        
+        match = _expiry_matcher(expiring_items)
+        usage_counts = dict.fromkeys(expiring_items, 0)
         
         for recipe in recipes:
             expiry_score = 0
-            recipe_ingredients = recipe.get("ingredients", [])
+            items_used = set()
             
-            for ingredient in recipe_ingredients:
-                if any(expiring in ingredient.lower() for expiring in expiring_items):
+            for ingredient in recipe.get("ingredients", []):
+                hits = match(ingredient.lower())
+                if hits:
                     expiry_score += 1
+                    items_used.update(hits)
             
             recipe["expiry_priority_score"] = expiry_score
-            prioritized.append(recipe)
+            for item in items_used:
+                usage_counts[item] += 1
         
-        return sorted(prioritized, key=lambda x: x["expiry_priority_score"], reverse=True)
+        usage_stats = {
+            item: {
+                "recipes_using": usage_count,
+                "utilization_rate": min(usage_count / len(recipes), 1.0) if recipes else 0
+            }
+            for item, usage_count in usage_counts.items()
+        }
+        
+        if top_k is None:
+            prioritized = sorted(recipes, key=_EXPIRY_SCORE, reverse=True)
+        else:
+            prioritized = heapq.nlargest(top_k, recipes, key=_EXPIRY_SCORE)
+        return prioritized, usage_stats
     
-    def _calculate_expiry_usage(self, recipes: List[Dict], expiring_items: List[str]) -> Dict[str, Any]:
-        """Calculate how well recipes use expiring ingredients"""
-        usage_stats = {}
+    def _score_recipes_with_kernel(self, recipes: List[Dict], expiring_items: List[str],
+                                   top_k: Optional[int] = None) -> Tuple[List[Dict], Dict[str, Any]]:
+        """Same ranking as _score_recipes_against_expiring, scored by the compiled kernel"""
+        import numpy as np
+        from agents.milo_nutrition.src import scoring_kernel
+        
+        scores, usage = scoring_kernel.score_recipes(
+            [[ingredient.lower() for ingredient in recipe.get("ingredients", [])] for recipe in recipes],
+            [item.lower() for item in expiring_items]
+        )
         
-        for item in expiring_items:
-            usage_count = 0
-            for recipe in recipes:
-                recipe_ingredients = recipe.get("ingredients", [])
-                if any(item.lower() in ingredient.lower() for ingredient in recipe_ingredients):
-                    usage_count += 1
-            
-            usage_stats[item] = {
+        for recipe, expiry_score in zip(recipes, scores.tolist()):
+            recipe["expiry_priority_score"] = expiry_score
+        
+        usage_stats = {
+            item: {
                 "recipes_using": usage_count,
                 "utilization_rate": min(usage_count / len(recipes), 1.0) if recipes else 0
             }
+            for item, usage_count in zip(expiring_items, usage.tolist())
+        }
         
-        return usage_stats
+        # Stable descending order, matching sorted(..., reverse=True)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [recipes[i] for i in order.tolist()], usage_stats
     
     def _suggest_meals_from_recipes(self, recipes: List[Dict]) -> Dict[str, List[str]]:
         """Suggest meal assignments for recipes"""
@@ -338,16 +570,17 @@ class MiloAgent(BaseMCPServer):
         
         for recipe in recipes[:6]:  # Top 6 recipes
             cooking_time = recipe.get("cooking_time", 30)
-            recipe_type = recipe.get("type", "main")
+            name_lc = recipe.get("name", "").lower()
             
-            if cooking_time <= 15 and "breakfast" in recipe.get("name", "").lower():
-                meal_suggestions["breakfast"].append(recipe["name"])
-            elif "salad" in recipe.get("name", "").lower() or cooking_time <= 20:
-                meal_suggestions["lunch"].append(recipe["name"])
+            if cooking_time <= 15 and "breakfast" in name_lc:
+                meal = "breakfast"
+            elif cooking_time <= 20 or "salad" in name_lc:
+                meal = "lunch"
             elif cooking_time > 20:
-                meal_suggestions["dinner"].append(recipe["name"])
+                meal = "dinner"
             else:
-                meal_suggestions["snacks"].append(recipe["name"])
+                meal = "snacks"
+            meal_suggestions[meal].append(recipe["name"])
         
         return meal_suggestions
     
@@ -362,74 +595,36 @@ class MiloAgent(BaseMCPServer):
     
     def _identify_batch_cooking(self, meals: Dict) -> List[str]:
         """Identify batch cooking opportunities"""
-        opportunities = []
-        
-        # Look for similar cooking methods or base ingredients
-        if any("rice" in str(meal).lower() for meal in meals.values()):
-            opportunities.append("Cook rice in large batch")
-        
-        if any("chicken" in str(meal).lower() for meal in meals.values()):
-            opportunities.append("Prep chicken proteins together")
-        
-        return opportunities
+        # Look for similar cooking methods or base ingredients; each meal is
+        # stringified and lowercased once, then every keyword is checked
+        meals_text = " ".join(str(meal).lower() for meal in meals.values())
+        return [suggestion for keyword, suggestion in _BATCH_COOKING_KEYWORDS.items() if keyword in meals_text]
     
     def _create_batch_cooking_schedule(self, prep_schedule: Dict) -> Dict[str, Any]:
         """Create optimized batch cooking schedule"""
-        return {
-            "sunday_batch_prep": {
-                "time": "14:00-16:00",
-                "tasks": ["Cook grains", "Prep proteins", "Wash and chop vegetables"],
-                "estimated_time": 120
-            },
-            "mid_week_prep": {
-                "time": "wednesday 18:00",
-                "tasks": ["Refresh vegetables", "Quick protein prep"],
-                "estimated_time": 30
-            }
-        }
+        return _thaw(_BATCH_COOKING_SCHEDULE)
     
     def _identify_time_savings(self, prep_schedule: Dict) -> List[str]:
         """Identify time-saving opportunities"""
-        return [
-            "Batch cook grains and proteins on Sunday",
-            "Pre-chop vegetables for the week",
-            "Use slow cooker for hands-off cooking",
-            "Prepare overnight oats for quick breakfasts"
-        ]
+        return list(_TIME_SAVINGS)
     
-    def _assess_equipment_needs(self, meal_plan: Dict) -> List[str]:
-        """Assess kitchen equipment needs for meal plan"""
+    def _find_equipment_triggers(self, meals: Dict) -> Set[str]:
+        """Cooking-method keywords mentioned anywhere in one day's meals"""
+        day_text = " ".join(str(meal).lower() for meal in meals.values())
+        return set(_EQUIPMENT_TRIGGER_RE.findall(day_text))
+    
+    def _assess_equipment_needs(self, triggers: Iterable[str]) -> List[str]:
+        """Assess kitchen equipment needs from the cooking methods found in the plan"""
         equipment = set()
         
         # Mock assessment based on meal types
         equipment.update(["cutting_board", "chef_knife", "measuring_cups"])
         
         # Add equipment based on cooking methods
-        if any("bake" in str(meal).lower() for day_meals in meal_plan.values() for meal in day_meals.values()):
-            equipment.add("baking_sheets")
-        
-        if any("stir" in str(meal).lower() for day_meals in meal_plan.values() for meal in day_meals.values()):
-            equipment.add("wok_or_large_pan")
+        equipment.update(_EQUIPMENT_TRIGGERS[keyword] for keyword in triggers)
         
         return list(equipment)
     
-    def _suggest_meal_adjustments(self, compliance_data: Dict) -> List[Dict[str, Any]]:
+    def _suggest_meal_adjustments(self, compliance_data: Dict) -> List[Dict[str, str]]:
         """Suggest specific meal adjustments based on compliance analysis"""
-        adjustments = []
-        
-        gaps = compliance_data.get("gaps", [])
-        for gap in gaps:
-            if gap == "insufficient_protein":
-                adjustments.append({
-                    "issue": "Low protein intake",
-                    "suggestion": "Add Greek yogurt to breakfast and legumes to lunch",
-                    "impact": "Increase daily protein by 20g"
-                })
-            elif gap == "low_fiber":
-                adjustments.append({
-                    "issue": "Insufficient fiber",
-                    "suggestion": "Include more vegetables and whole grains",
-                    "impact": "Improve digestive health and satiety"
-                })
-        
-        return adjustments
\ No newline at end of file
+        return [dict(_ADJUSTMENT_TABLE[gap]) for gap in compliance_data.get("gaps", ()) if gap in _ADJUSTMENT_TABLE]
\ No newline at end of file
@@ -9,6 +9,14 @@ import sys
 import os
 from datetime import datetime
 
+import httpx
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
@@ -51,9 +59,19 @@ async def main():
         }
     }
     
-    agent = MiloAgent(config)
-    print("✅ Agent Milo initialized successfully!")
-    await agent.start()
+    # One connection pool for every tool's Spoonacular/Edamam/USDA calls
+    shared_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        http2=HTTP2_AVAILABLE
+    )
+    config["shared_http"] = shared_client
+    
+    try:
+        agent = MiloAgent(config)
+        print("✅ Agent Milo initialized successfully!")
+        await agent.start()
+    finally:
+        await shared_client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Expiring-ingredient scoring kernel
+Native-code substring sweep used to rank large recipe corpora
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    # Explicit signature compiles (or loads from the on-disk cache) at import,
+    # so the first large pantry does not pay the compile cost
+    @njit("Tuple((int64[:], int64[:]))(uint8[:], int64[:], int64[:], uint8[:], int64[:])", cache=True)
+    def score(ingredient_bytes, ingredient_offsets, recipe_offsets, item_bytes, item_offsets):
+        """
+        CSR sweep over recipes -> ingredients -> expiring items.
+        Returns per-recipe expiry scores and per-item recipe usage counts.
+        """
+        n_recipes = recipe_offsets.shape[0] - 1
+        n_items = item_offsets.shape[0] - 1
+        scores = np.zeros(n_recipes, dtype=np.int64)
+        usage = np.zeros(n_items, dtype=np.int64)
+        used = np.zeros(n_items, dtype=np.bool_)
+
+        for r in range(n_recipes):
+            used[:] = False
+            for g in range(recipe_offsets[r], recipe_offsets[r + 1]):
+                g_start = ingredient_offsets[g]
+                g_end = ingredient_offsets[g + 1]
+                matched = False
+                for k in range(n_items):
+                    k_start = item_offsets[k]
+                    k_len = item_offsets[k + 1] - k_start
+                    for i in range(g_start, g_end - k_len + 1):
+                        j = 0
+                        while j < k_len and ingredient_bytes[i + j] == item_bytes[k_start + j]:
+                            j += 1
+                        if j == k_len:
+                            matched = True
+                            used[k] = True
+                            break
+                if matched:
+                    scores[r] += 1
+            for k in range(n_items):
+                if used[k]:
+                    usage[k] += 1
+
+        return scores, usage
+
+def _pack(chunks: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate byte strings into one buffer plus CSR offsets"""
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(c) for c in chunks])
+    # bytearray keeps the buffer writable; Numba types read-only arrays differently
+    return np.frombuffer(bytearray(b"".join(chunks)), dtype=np.uint8), offsets
+
+def score_recipes(ingredients_lc: List[List[str]], items_lc: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode lowercased recipe ingredients and expiring items, then run the kernel.
+    Callers should check NUMBA_AVAILABLE first.
+    """
+    recipe_offsets = np.zeros(len(ingredients_lc) + 1, dtype=np.int64)
+    recipe_offsets[1:] = np.cumsum([len(ings) for ings in ingredients_lc])
+    ingredient_bytes, ingredient_offsets = _pack([ing.encode("utf-8") for ings in ingredients_lc for ing in ings])
+    item_bytes, item_offsets = _pack([item.encode("utf-8") for item in items_lc])
+    return score(ingredient_bytes, ingredient_offsets, recipe_offsets, item_bytes, item_offsets)
@@ -0,0 +1,70 @@
+"""
+Tests for Agent Milo's A2A message handling
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from agents.milo_nutrition.src.agent import MiloAgent
+from shared.a2a_protocol import message_router
+from shared.a2a_protocol.message_router import MSGSPEC_AVAILABLE, A2AMessage, decode_a2a_message
+
+MESSAGE = {
+    "from_agent": "luna",
+    "to_agent": "milo",
+    "intent": "analyze_nutrition_goals",
+    "payload": {"fitness_goals": ["muscle_gain"]},
+    "session_id": "session_1"
+}
+
+
+def test_decode_parses_string_timestamp():
+    message = decode_a2a_message({**MESSAGE, "timestamp": "2025-08-10T12:30:00"})
+    assert message.timestamp == datetime(2025, 8, 10, 12, 30)
+    assert message.to_dict()["timestamp"] == "2025-08-10T12:30:00"
+
+
+def test_decode_without_msgspec_parses_string_timestamp(monkeypatch):
+    monkeypatch.setattr(message_router, "MSGSPEC_AVAILABLE", False)
+    data = {**MESSAGE, "timestamp": "2025-08-10T12:30:00"}
+    message = decode_a2a_message(data)
+    assert isinstance(message, A2AMessage)
+    assert message.timestamp == datetime(2025, 8, 10, 12, 30)
+    assert data["timestamp"] == "2025-08-10T12:30:00"
+
+
+def test_decode_derives_message_id():
+    message = decode_a2a_message(MESSAGE)
+    assert message.message_id.startswith("msg_")
+    assert decode_a2a_message({**MESSAGE, "message_id": "m1"}).message_id == "m1"
+
+
+def test_decoded_message_is_read_only():
+    message = decode_a2a_message(MESSAGE)
+    with pytest.raises(AttributeError):
+        message.intent = "create_meal_plan"
+
+
+def test_decode_rejects_unknown_fields():
+    with pytest.raises((TypeError, ValueError)):
+        decode_a2a_message({**MESSAGE, "unexpected": True})
+
+
+@pytest.mark.skipif(not MSGSPEC_AVAILABLE, reason="field types are only checked by msgspec")
+def test_decode_rejects_wrong_field_types():
+    with pytest.raises(ValueError):
+        decode_a2a_message({**MESSAGE, "payload": "not an object"})
+
+
+def test_process_message_with_string_timestamp():
+    message = {
+        **MESSAGE,
+        "intent": "optimize_meal_prep",
+        "payload": {"meal_plan": {"monday": {"lunch": {"name": "Chicken rice", "prep_time": 25}}}},
+        "timestamp": "2025-08-10T12:30:00"
+    }
+    response = asyncio.run(MiloAgent({}).process_a2a_message(message))
+    assert response["success"] is True
+    assert response["total_weekly_prep_time"] == 25
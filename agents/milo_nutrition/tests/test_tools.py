@@ -0,0 +1,55 @@
+"""
+Tests for Milo's meal planner tool
+"""
+
+import pytest
+
+from agents.milo_nutrition.tools.meal_planner import MealPlannerTool, _plain
+from shared.mcp_framework.base_server import ExecutionContext
+
+PLAN_PARAMETERS = {
+    "action": "create_weekly_plan",
+    "dietary_restrictions": ["vegetarian"],
+    "time_constraints": {"busy_days": ["monday", "friday"]},
+    "dietary_goals": {"calories_per_day": 1800}
+}
+
+
+@pytest.fixture
+def context():
+    return ExecutionContext("test_user", "test_session", ("read",))
+
+
+@pytest.mark.parametrize("seed", [None, 0, 42])
+def test_weekly_plan_is_deterministic(context, seed):
+    parameters = {**PLAN_PARAMETERS, "seed": seed}
+    first = _plain(MealPlannerTool()._create_weekly_meal_plan(parameters, context))
+    # Each call samples the plan again, so the seed alone fixes the result
+    second = _plain(MealPlannerTool()._create_weekly_meal_plan(parameters, context))
+    assert first == second
+
+
+@pytest.mark.parametrize("seed", [None, 7])
+def test_monthly_first_week_matches_weekly_plan(context, seed):
+    tool = MealPlannerTool()
+    parameters = {**PLAN_PARAMETERS, "seed": seed}
+    weekly = _plain(tool._create_weekly_meal_plan(parameters, context))
+    monthly = _plain(tool._create_monthly_meal_plan({**parameters, "action": "create_monthly_plan"}, context))
+    assert monthly["meal_plan"]["monthly_schedule"]["week_1"] == weekly["meal_plan"]
+
+
+@pytest.mark.parametrize("seed", [-1, 3.5, "7", True])
+def test_invalid_seed_is_rejected(context, seed):
+    with pytest.raises(ValueError, match="seed must be a non-negative integer"):
+        MealPlannerTool()._create_weekly_meal_plan({**PLAN_PARAMETERS, "seed": seed}, context)
+
+
+def test_unusual_list_entries_are_ignored(context):
+    parameters = {
+        **PLAN_PARAMETERS,
+        "dietary_restrictions": ["vegetarian", ["keto"], 3],
+        "time_constraints": {"busy_days": ["monday", ["friday"]]},
+        "seed": 1
+    }
+    result = _plain(MealPlannerTool()._create_weekly_meal_plan(parameters, context))
+    assert list(result["meal_plan"]) == ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
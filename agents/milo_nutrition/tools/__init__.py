@@ -3,12 +3,27 @@ Agent Milo Tools Package
 All meal planning and nutrition tools
 """
 
-from .recipe_engine import RecipeEngineTool
-from .nutrition_analyzer import NutritionAnalyzerTool
-from .meal_planner import MealPlannerTool
+from importlib import import_module
 
 __all__ = [
     "RecipeEngineTool",
     "NutritionAnalyzerTool", 
     "MealPlannerTool"
-]
\ No newline at end of file
+]
+
+# Tool class -> submodule; each is imported on first attribute access (PEP 562)
+_TOOL_MODULES = {
+    "RecipeEngineTool": ".recipe_engine",
+    "NutritionAnalyzerTool": ".nutrition_analyzer",
+    "MealPlannerTool": ".meal_planner"
+}
+
+def __getattr__(name):
+    if name in _TOOL_MODULES:
+        tool_class = getattr(import_module(_TOOL_MODULES[name], __name__), name)
+        globals()[name] = tool_class
+        return tool_class
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Meal kernels
+Native-code aggregation and health scoring for meal plans and nutrition analysis
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    # Explicit signatures compile (or load from the on-disk cache) at import,
+    # so the first plan request does not pay the compile cost
+    @njit("Tuple((int64[:, :, :], int64[:, :]))(int64[:, :], int64[:], intp[:, :, :])", cache=True)
+    def aggregate(nutrients, prep_times, selections):
+        """
+        Sum template rows picked by an (n_weeks, days, meal types) selection.
+        Returns per-day nutrient totals and per-day prep times.
+        """
+        n_weeks, n_days, n_slots = selections.shape
+        n_nutrients = nutrients.shape[1]
+        daily_nutrients = np.zeros((n_weeks, n_days, n_nutrients), dtype=np.int64)
+        daily_prep_times = np.zeros((n_weeks, n_days), dtype=np.int64)
+
+        for w in range(n_weeks):
+            for d in range(n_days):
+                for m in range(n_slots):
+                    row = selections[w, d, m]
+                    daily_prep_times[w, d] += prep_times[row]
+                    for k in range(n_nutrients):
+                        daily_nutrients[w, d, k] += nutrients[row, k]
+
+        return daily_nutrients, daily_prep_times
+
+    @njit("int64(float64, float64[:], int64[:, :], int64[:])", cache=True)
+    def health_score(calories, macros, bounds, kcal):
+        """
+        Base score 7, +1 per macro inside its ideal percent range and -1 per
+        macro outside its acceptable range, clipped to 0-10.
+        """
+        if calories == 0:
+            return 0
+        score = 7
+        for i in range(macros.shape[0]):
+            percent = macros[i] * kcal[i] / calories * 100
+            if bounds[i, 0] <= percent <= bounds[i, 1]:
+                score += 1
+            elif percent < bounds[i, 2] or percent > bounds[i, 3]:
+                score -= 1
+        return max(0, min(10, score))
+
+    @njit("float64(float64, float64, float64)", cache=True)
+    def score_meal(protein_percent, fiber, calories):
+        """
+        Meal health score: base 7 adjusted for protein share, fiber grams and
+        calorie density, clipped to 0-10.
+        """
+        score = 7.0
+        if 25 <= protein_percent <= 35:
+            score += 1
+        elif protein_percent < 15 or protein_percent > 40:
+            score -= 1
+
+        if fiber >= 8:
+            score += 1
+        elif fiber >= 5:
+            score += 0.5
+        elif fiber < 3:
+            score -= 1
+
+        if calories <= 600:
+            score += 0.5
+        elif calories > 800:
+            score -= 0.5
+
+        return max(0.0, min(10.0, score))
+
+    @njit("float64(float64[:])", cache=True)
+    def score_daily(percentages):
+        """Mean of per-nutrient scores for target achievement percentages; 5 when empty"""
+        n = percentages.shape[0]
+        if n == 0:
+            return 5.0
+        total = 0.0
+        for i in range(n):
+            percentage = percentages[i]
+            if 90 <= percentage <= 110:
+                total += 10
+            elif 80 <= percentage <= 120:
+                total += 8
+            elif 70 <= percentage <= 130:
+                total += 6
+            else:
+                total += 4
+        return total / n
@@ -3,94 +3,387 @@ Meal Planner Tool for Agent Milo
 Strategic meal planning and coordination
 """
 
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-import random
+from types import MappingProxyType
+from typing import Callable, Dict, Final, List, Any, Mapping, NamedTuple, Optional, Tuple
 
+import httpx
+import numpy as np
+
+from agents.milo_nutrition.tools import _meal_kernels
 from shared.mcp_framework.base_server import BaseMCPTool, ExecutionContext, ExecutionResult
+from shared.utils.helpers import hash_string
 
-class MealPlannerTool(BaseMCPTool):
-    """Strategic meal planning and coordination"""
+# Meal templates for different dietary needs; shared read-only by every instance
+_MEAL_TEMPLATES: Mapping[str, Mapping[str, Tuple[Dict[str, Any], ...]]] = MappingProxyType({
+    "standard": MappingProxyType({
+        "breakfast": (
+            {"name": "Overnight Oats", "prep_time": 5, "calories": 320, "protein": 12, "carbs": 58, "fat": 8},
+            {"name": "Scrambled Eggs with Toast", "prep_time": 10, "calories": 350, "protein": 18, "carbs": 25, "fat": 20},
+            {"name": "Greek Yogurt Parfait", "prep_time": 5, "calories": 280, "protein": 15, "carbs": 35, "fat": 8}
+        ),
+        "lunch": (
+            {"name": "Quinoa Buddha Bowl", "prep_time": 25, "calories": 420, "protein": 15, "carbs": 52, "fat": 16},
+            {"name": "Chicken Caesar Salad", "prep_time": 15, "calories": 380, "protein": 32, "carbs": 12, "fat": 22},
+            {"name": "Turkey Sandwich", "prep_time": 5, "calories": 340, "protein": 24, "carbs": 35, "fat": 12}
+        ),
+        "dinner": (
+            {"name": "Grilled Salmon with Vegetables", "prep_time": 30, "calories": 480, "protein": 35, "carbs": 20, "fat": 28},
+            {"name": "Chicken Stir Fry", "prep_time": 20, "calories": 380, "protein": 32, "carbs": 28, "fat": 15},
+            {"name": "Lean Beef with Sweet Potato", "prep_time": 35, "calories": 450, "protein": 30, "carbs": 35, "fat": 18}
+        ),
+        "snacks": (
+            {"name": "Apple with Almond Butter", "prep_time": 2, "calories": 190, "protein": 6, "carbs": 20, "fat": 12},
+            {"name": "Greek Yogurt", "prep_time": 1, "calories": 150, "protein": 15, "carbs": 12, "fat": 5},
+            {"name": "Trail Mix", "prep_time": 1, "calories": 160, "protein": 5, "carbs": 15, "fat": 10}
+        )
+    }),
+    "vegetarian": MappingProxyType({
+        "breakfast": (
+            {"name": "Smoothie Bowl", "prep_time": 8, "calories": 350, "protein": 12, "carbs": 65, "fat": 8},
+            {"name": "Avocado Toast", "prep_time": 5, "calories": 320, "protein": 8, "carbs": 30, "fat": 20}
+        ),
+        "lunch": (
+            {"name": "Lentil Soup", "prep_time": 30, "calories": 300, "protein": 18, "carbs": 45, "fat": 5},
+            {"name": "Caprese Salad", "prep_time": 10, "calories": 250, "protein": 12, "carbs": 8, "fat": 18}
+        ),
+        "dinner": (
+            {"name": "Vegetable Curry", "prep_time": 35, "calories": 400, "protein": 12, "carbs": 55, "fat": 15},
+            {"name": "Stuffed Bell Peppers", "prep_time": 45, "calories": 350, "protein": 15, "carbs": 48, "fat": 10}
+        )
+    }),
+    "low_carb": MappingProxyType({
+        "breakfast": (
+            {"name": "Veggie Omelet", "prep_time": 12, "calories": 280, "protein": 20, "carbs": 8, "fat": 18},
+            {"name": "Chia Pudding", "prep_time": 5, "calories": 220, "protein": 8, "carbs": 12, "fat": 16}
+        ),
+        "lunch": (
+            {"name": "Zucchini Noodles with Chicken", "prep_time": 20, "calories": 320, "protein": 28, "carbs": 12, "fat": 18},
+            {"name": "Cobb Salad", "prep_time": 15, "calories": 380, "protein": 25, "carbs": 10, "fat": 28}
+        ),
+        "dinner": (
+            {"name": "Cauliflower Rice Stir Fry", "prep_time": 25, "calories": 300, "protein": 22, "carbs": 15, "fat": 18},
+            {"name": "Baked Cod with Asparagus", "prep_time": 25, "calories": 280, "protein": 30, "carbs": 8, "fat": 12}
+        )
+    })
+})
+
+_PLAN_DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_MEAL_TYPES = ("breakfast", "lunch", "dinner", "snacks")
+_NUTRIENTS = ("calories", "protein", "carbs", "fat")
+
+# On busy days lunch and dinner are limited to quick meals
+_FAST_PREP_LIMIT = 15
+_FAST_MEAL_TYPES = ("lunch", "dinner")
+
+class _TemplateArrays(NamedTuple):
+    """
+    Structure-of-arrays view of one meal template. Meals of every type share
+    one row space; the extra last row is all zeros and stands for "no meal".
+    """
+    meals: Tuple[Dict[str, Any], ...]
+    nutrients: np.ndarray  # (rows, len(_NUTRIENTS))
+    prep_times: np.ndarray  # (rows,)
+    # [busy, meal type, k] -> k-th candidate row, padded with the "no meal" row;
+    # busy days only offer quick lunches and dinners
+    candidates: np.ndarray  # (2, len(_MEAL_TYPES), max candidates)
+    candidate_counts: np.ndarray  # (2, len(_MEAL_TYPES))
+
+def _build_template_arrays(template: Mapping[str, Tuple[Dict[str, Any], ...]]) -> _TemplateArrays:
+    meals: List[Dict[str, Any]] = []
+    options: List[List[int]] = []
+    busy_options: List[List[int]] = []
+    for meal_type in _MEAL_TYPES:
+        start = len(meals)
+        meals.extend(template.get(meal_type, ()))
+        rows = list(range(start, len(meals)))
+        options.append(rows)
+        if meal_type in _FAST_MEAL_TYPES:
+            rows = [row for row in rows if meals[row]["prep_time"] <= _FAST_PREP_LIMIT]
+        busy_options.append(rows)
     
-    def __init__(self):
-        super().__init__("meal_planner", "Create comprehensive meal plans and optimize nutrition timing")
-        self.meal_templates = self._load_meal_templates()
-        self.dietary_restrictions_map = self._load_dietary_restrictions()
+    # Interned names let variety scoring's set lookups match by identity
+    for meal in meals:
+        meal["name"] = sys.intern(meal["name"])
     
-    def get_parameter_schema(self) -> Dict[str, Any]:
+    no_meal = len(meals)
+    nutrients = np.zeros((no_meal + 1, len(_NUTRIENTS)), dtype=np.int64)
+    nutrients[:-1] = [[meal.get(nutrient, 0) for nutrient in _NUTRIENTS] for meal in meals]
+    prep_times = np.zeros(no_meal + 1, dtype=np.int64)
+    prep_times[:-1] = [meal.get("prep_time", 0) for meal in meals]
+    
+    width = max(1, max(map(len, options)))
+    candidates = np.full((2, len(_MEAL_TYPES), width), no_meal, dtype=np.intp)
+    candidate_counts = np.zeros((2, len(_MEAL_TYPES)), dtype=np.int64)
+    for busy, per_type in enumerate((options, busy_options)):
+        for type_index, rows in enumerate(per_type):
+            candidates[busy, type_index, :len(rows)] = rows
+            candidate_counts[busy, type_index] = len(rows)
+    return _TemplateArrays(tuple(meals), nutrients, prep_times, candidates, candidate_counts)
+
+_TEMPLATE_ARRAYS: Mapping[str, _TemplateArrays] = MappingProxyType({
+    template_key: _build_template_arrays(template) for template_key, template in _MEAL_TEMPLATES.items()
+})
+
+# Meal -> (ingredient names, per-person amounts). Mock ingredient database;
+# would integrate with recipe database.
+_BASE_INGREDIENTS: Mapping[str, Tuple[Tuple[str, ...], np.ndarray]] = MappingProxyType({
+    "Overnight Oats": (("oats", "milk", "berries", "honey"), np.array([0.5, 0.25, 0.1, 0.02])),
+    "Quinoa Buddha Bowl": (("quinoa", "vegetables", "olive oil", "tahini"), np.array([0.3, 0.4, 0.02, 0.03])),
+    "Chicken Stir Fry": (("chicken", "vegetables", "soy sauce", "oil"), np.array([0.2, 0.3, 0.02, 0.01])),
+    "Grilled Salmon with Vegetables": (("salmon", "vegetables", "lemon", "herbs"), np.array([0.15, 0.3, 0.05, 0.01])),
+    "Greek Yogurt Parfait": (("yogurt", "granola", "berries", "honey"), np.array([0.2, 0.05, 0.1, 0.02]))
+})
+_GENERIC_INGREDIENTS = (("generic_ingredients",), np.array([1.0]))
+
+# Per-macro (ideal low, ideal high, poor below, poor above) percent of calories
+# for protein, carbs and fat, with the kcal per gram used to get there
+_MACRO_BOUNDS = np.array([[15, 25, 10, 30], [45, 65, 30, 75], [20, 35, 15, 40]], dtype=np.int64)
+_MACRO_KCAL = np.array([4, 4, 9], dtype=np.int64)
+
+# Lowercased ingredient -> (shopping-list category, mock unit price in cents).
+# Prices are per kg unless noted and would come from grocery pricing APIs in
+# production; costs stay in integer cents until they are reported.
+_INGREDIENT_META: Mapping[str, Tuple[str, int]] = MappingProxyType({
+    "vegetables": ("produce", 300),
+    "fruits": ("produce", 300),
+    "berries": ("other", 400),
+    "chicken": ("proteins", 800),
+    "salmon": ("other", 1500),
+    "beef": ("proteins", 300),
+    "fish": ("proteins", 300),
+    "eggs": ("proteins", 300),  # per dozen
+    "milk": ("dairy", 150),  # per liter
+    "cheese": ("dairy", 800),
+    "yogurt": ("dairy", 500),
+    "quinoa": ("other", 600),
+    "rice": ("grains", 300),
+    "bread": ("grains", 300),
+    "oats": ("grains", 250),
+    "oil": ("pantry", 400),
+    "spices": ("pantry", 200),
+    "nuts": ("pantry", 300)
+})
+_DEFAULT_INGREDIENT_META = ("other", 300)
+
+def _ingredient_cost_cents(ingredient_lc: str, amount: float) -> int:
+    """Estimated cost in whole cents (half a cent rounds up) of an amount of a lowercased ingredient"""
+    unit_price_cents = _INGREDIENT_META.get(ingredient_lc, _DEFAULT_INGREDIENT_META)[1]
+    return int(unit_price_cents * amount + 0.5)
+
+# Mock per-meal cost in cents by meal type - would integrate with real pricing data
+_MEAL_COST_CENTS: Mapping[str, int] = MappingProxyType({
+    "breakfast": 350,
+    "lunch": 500,
+    "dinner": 750,
+    "snacks": 200
+})
+_DEFAULT_MEAL_COST_CENTS = 500
+
+# Meal plan changes suggested for each fitness goal; callers get copies
+_GOAL_ADAPTATIONS: Mapping[str, Tuple[Dict[str, str], ...]] = MappingProxyType({
+    "weight_loss": (
+        {
+            "change": "reduce_portion_sizes",
+            "description": "Reduce main meal portions by 15-20%",
+            "impact": "300-400 fewer calories per day"
+        },
+        {
+            "change": "increase_vegetables",
+            "description": "Fill half the plate with non-starchy vegetables",
+            "impact": "Increased fiber and satiety"
+        },
+        {
+            "change": "modify_snacks",
+            "description": "Replace calorie-dense snacks with fruits and vegetables",
+            "impact": "200-300 fewer calories from snacks"
+        }
+    ),
+    "muscle_gain": (
+        {
+            "change": "increase_protein",
+            "description": "Add protein source to each meal and snack",
+            "impact": "20-30g additional protein per day"
+        },
+        {
+            "change": "post_workout_nutrition",
+            "description": "Include protein + carb snack within 30 minutes of workouts",
+            "impact": "Enhanced muscle protein synthesis"
+        },
+        {
+            "change": "calorie_increase",
+            "description": "Increase overall calories by 300-500 per day",
+            "impact": "Support for muscle building"
+        }
+    ),
+    "endurance_performance": (
+        {
+            "change": "carb_timing",
+            "description": "Emphasize carbs before and after long workouts",
+            "impact": "Better energy and recovery"
+        },
+        {
+            "change": "hydration_focus",
+            "description": "Increase fluid intake and add electrolytes",
+            "impact": "Improved endurance performance"
+        }
+    )
+})
+
+# Daily nutrition targets and the per-goal multipliers applied to them
+_TARGET_NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber")
+_BASE_NUTRITION_TARGETS = np.array([2000, 100, 250, 65, 25], dtype=np.float64)
+_GOAL_MULTIPLIERS: Mapping[str, np.ndarray] = MappingProxyType({
+    # 15% fewer calories, higher protein for satiety
+    "weight_loss": np.array([0.85, 1.2, 1.0, 1.0, 1.0]),
+    # 15% more calories, higher protein for muscle building
+    "muscle_gain": np.array([1.15, 1.5, 1.0, 1.0, 1.0]),
+    # Higher carbs for energy
+    "endurance_performance": np.array([1.0, 1.0, 1.3, 1.0, 1.0])
+})
+
+# Foods to avoid for different dietary restrictions
+_DIETARY_RESTRICTIONS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "vegetarian": ("beef", "chicken", "pork", "fish", "seafood"),
+    "vegan": ("beef", "chicken", "pork", "fish", "seafood", "dairy", "eggs", "honey"),
+    "gluten_free": ("wheat", "barley", "rye", "pasta", "bread"),
+    "dairy_free": ("milk", "cheese", "yogurt", "butter", "cream"),
+    "nut_free": ("almonds", "peanuts", "walnuts", "cashews", "tree nuts"),
+    "low_carb": ("bread", "pasta", "rice", "potatoes", "sugar"),
+    "keto": ("bread", "pasta", "rice", "fruits", "sugar", "grains")
+})
+
+# Interior plan records. A monthly plan holds 28 days, so these are slotted
+# dataclasses rather than dicts; execute expands them at the MCP boundary.
+@dataclass(slots=True)
+class DayNutrition:
+    calories: int
+    protein: int
+    carbs: int
+    fat: int
+
+@dataclass(slots=True)
+class DayPlan:
+    meals: Dict[str, Dict[str, Any]]
+    daily_nutrition: DayNutrition
+    prep_time_total: int
+
+def _plain(value: Any) -> Any:
+    """
+    Expand DayPlan records nested in a result into plain dicts. Template meals
+    are flat, so each gets a one-level copy instead of asdict's deep copy.
+    """
+    if isinstance(value, DayPlan):
+        nutrition = value.daily_nutrition
         return {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["create_weekly_plan", "create_monthly_plan", "optimize_meal_timing", "generate_shopping_list", "adapt_for_goals"]
-                },
-                "dietary_goals": {
-                    "type": "object",
-                    "properties": {
-                        "calories_per_day": {"type": "number"},
-                        "protein_grams": {"type": "number"},
-                        "carb_grams": {"type": "number"},
-                        "fat_grams": {"type": "number"},
-                        "fiber_grams": {"type": "number"}
-                    }
-                },
-                "dietary_restrictions": {
-                    "type": "array",
-                    "items": {
-                        "type": "string",
-                        "enum": ["vegetarian", "vegan", "gluten_free", "dairy_free", "nut_free", "low_carb", "keto", "paleo"]
-                    }
-                },
-                "available_ingredients": {"type": "array"},
-                "budget_constraint": {"type": "number"},
-                "time_constraints": {
-                    "type": "object",
-                    "properties": {
-                        "prep_time_limit": {"type": "integer"},
-                        "cooking_skill": {"type": "string", "enum": ["beginner", "intermediate", "advanced"]},
-                        "busy_days": {"type": "array"}
-                    }
-                },
-                "family_preferences": {
-                    "type": "object",
-                    "properties": {
-                        "favorite_cuisines": {"type": "array"},
-                        "disliked_foods": {"type": "array"},
-                        "family_size": {"type": "integer"}
-                    }
-                },
-                "fitness_schedule": {"type": "object"}
+            "meals": {meal_type: dict(meal) for meal_type, meal in value.meals.items()},
+            "daily_nutrition": {
+                "calories": nutrition.calories,
+                "protein": nutrition.protein,
+                "carbs": nutrition.carbs,
+                "fat": nutrition.fat
             },
-            "required": ["action"]
+            "prep_time_total": value.prep_time_total
         }
-    
-    def get_return_schema(self) -> Dict[str, Any]:
-        return {
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+# Tool schemas, built once at import and shared by every request
+_PARAMETER_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "action": {
+            "type": "string",
+            "enum": ["create_weekly_plan", "create_monthly_plan", "optimize_meal_timing", "generate_shopping_list", "adapt_for_goals"]
+        },
+        "dietary_goals": {
+            "type": "object",
+            "properties": {
+                "calories_per_day": {"type": "number"},
+                "protein_grams": {"type": "number"},
+                "carb_grams": {"type": "number"},
+                "fat_grams": {"type": "number"},
+                "fiber_grams": {"type": "number"}
+            }
+        },
+        "dietary_restrictions": {
+            "type": "array",
+            "items": {
+                "type": "string",
+                "enum": ["vegetarian", "vegan", "gluten_free", "dairy_free", "nut_free", "low_carb", "keto", "paleo"]
+            }
+        },
+        "available_ingredients": {"type": "array"},
+        "budget_constraint": {"type": "number"},
+        "time_constraints": {
+            "type": "object",
+            "properties": {
+                "prep_time_limit": {"type": "integer"},
+                "cooking_skill": {"type": "string", "enum": ["beginner", "intermediate", "advanced"]},
+                "busy_days": {"type": "array"}
+            }
+        },
+        "family_preferences": {
             "type": "object",
             "properties": {
-                "meal_plan": {"type": "object"},
-                "nutrition_summary": {"type": "object"},
-                "shopping_list": {"type": "array"},
-                "prep_schedule": {"type": "object"},
-                "cost_estimate": {"type": "number"}
+                "favorite_cuisines": {"type": "array"},
+                "disliked_foods": {"type": "array"},
+                "family_size": {"type": "integer"}
             }
+        },
+        "fitness_schedule": {"type": "object"},
+        "seed": {"type": "integer", "minimum": 0}
+    },
+    "required": ["action"]
+}
+
+_RETURN_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "meal_plan": {"type": "object"},
+        "nutrition_summary": {"type": "object"},
+        "shopping_list": {"type": "array"},
+        "prep_schedule": {"type": "object"},
+        "cost_estimate": {"type": "number"}
+    }
+}
+
+class MealPlannerTool(BaseMCPTool):
+    """Strategic meal planning and coordination"""
+    
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        super().__init__("meal_planner", "Create comprehensive meal plans and optimize nutrition timing", http=http)
+        self.meal_templates = _MEAL_TEMPLATES
+        self.template_arrays = _TEMPLATE_ARRAYS
+        self.dietary_restrictions_map = _DIETARY_RESTRICTIONS
+        
+        # Action name -> bound handler, used by execute
+        self._dispatch: Dict[str, Callable[[Dict, ExecutionContext], Dict[str, Any]]] = {
+            "create_weekly_plan": self._create_weekly_meal_plan,
+            "create_monthly_plan": self._create_monthly_meal_plan,
+            "optimize_meal_timing": self._optimize_meal_timing,
+            "generate_shopping_list": self._generate_shopping_list_from_plan,
+            "adapt_for_goals": self._adapt_plan_for_goals
         }
     
+    def get_parameter_schema(self) -> Dict[str, Any]:
+        return _PARAMETER_SCHEMA
+    
+    def get_return_schema(self) -> Dict[str, Any]:
+        return _RETURN_SCHEMA
+    
     async def execute(self, parameters: Dict[str, Any], context: ExecutionContext) -> ExecutionResult:
         action = parameters["action"]
         
         try:
-            if action == "create_weekly_plan":
-                result = await self._create_weekly_meal_plan(parameters, context)
-            elif action == "create_monthly_plan":
-                result = await self._create_monthly_meal_plan(parameters, context)
-            elif action == "optimize_meal_timing":
-                result = await self._optimize_meal_timing(parameters, context)
-            elif action == "generate_shopping_list":
-                result = await self._generate_shopping_list_from_plan(parameters, context)
-            else:  # adapt_for_goals
-                result = await self._adapt_plan_for_goals(parameters, context)
+            handler = self._dispatch.get(action)
+            if handler is None:
+                raise ValueError(f"Unknown action: {action}")
+            result = _plain(handler(parameters, context))
             
             return ExecutionResult(success=True, result=result, execution_time=2.0)
             
@@ -98,134 +391,25 @@ class MealPlannerTool(BaseMCPTool):
             self.logger.error(f"Meal planning failed: {e}")
             return ExecutionResult(success=False, error=str(e), execution_time=0.0)
     
-    def _load_meal_templates(self) -> Dict[str, Any]:
-        """Load meal templates for different dietary needs"""
-        return {
-            "standard": {
-                "breakfast": [
-                    {"name": "Overnight Oats", "prep_time": 5, "calories": 320, "protein": 12, "carbs": 58, "fat": 8},
-                    {"name": "Scrambled Eggs with Toast", "prep_time": 10, "calories": 350, "protein": 18, "carbs": 25, "fat": 20},
-                    {"name": "Greek Yogurt Parfait", "prep_time": 5, "calories": 280, "protein": 15, "carbs": 35, "fat": 8}
-                ],
-                "lunch": [
-                    {"name": "Quinoa Buddha Bowl", "prep_time": 25, "calories": 420, "protein": 15, "carbs": 52, "fat": 16},
-                    {"name": "Chicken Caesar Salad", "prep_time": 15, "calories": 380, "protein": 32, "carbs": 12, "fat": 22},
-                    {"name": "Turkey Sandwich", "prep_time": 5, "calories": 340, "protein": 24, "carbs": 35, "fat": 12}
-                ],
-                "dinner": [
-                    {"name": "Grilled Salmon with Vegetables", "prep_time": 30, "calories": 480, "protein": 35, "carbs": 20, "fat": 28},
-                    {"name": "Chicken Stir Fry", "prep_time": 20, "calories": 380, "protein": 32, "carbs": 28, "fat": 15},
-                    {"name": "Lean Beef with Sweet Potato", "prep_time": 35, "calories": 450, "protein": 30, "carbs": 35, "fat": 18}
-                ],
-                "snacks": [
-                    {"name": "Apple with Almond Butter", "prep_time": 2, "calories": 190, "protein": 6, "carbs": 20, "fat": 12},
-                    {"name": "Greek Yogurt", "prep_time": 1, "calories": 150, "protein": 15, "carbs": 12, "fat": 5},
-                    {"name": "Trail Mix", "prep_time": 1, "calories": 160, "protein": 5, "carbs": 15, "fat": 10}
-                ]
-            },
-            "vegetarian": {
-                "breakfast": [
-                    {"name": "Smoothie Bowl", "prep_time": 8, "calories": 350, "protein": 12, "carbs": 65, "fat": 8},
-                    {"name": "Avocado Toast", "prep_time": 5, "calories": 320, "protein": 8, "carbs": 30, "fat": 20}
-                ],
-                "lunch": [
-                    {"name": "Lentil Soup", "prep_time": 30, "calories": 300, "protein": 18, "carbs": 45, "fat": 5},
-                    {"name": "Caprese Salad", "prep_time": 10, "calories": 250, "protein": 12, "carbs": 8, "fat": 18}
-                ],
-                "dinner": [
-                    {"name": "Vegetable Curry", "prep_time": 35, "calories": 400, "protein": 12, "carbs": 55, "fat": 15},
-                    {"name": "Stuffed Bell Peppers", "prep_time": 45, "calories": 350, "protein": 15, "carbs": 48, "fat": 10}
-                ]
-            },
-            "low_carb": {
-                "breakfast": [
-                    {"name": "Veggie Omelet", "prep_time": 12, "calories": 280, "protein": 20, "carbs": 8, "fat": 18},
-                    {"name": "Chia Pudding", "prep_time": 5, "calories": 220, "protein": 8, "carbs": 12, "fat": 16}
-                ],
-                "lunch": [
-                    {"name": "Zucchini Noodles with Chicken", "prep_time": 20, "calories": 320, "protein": 28, "carbs": 12, "fat": 18},
-                    {"name": "Cobb Salad", "prep_time": 15, "calories": 380, "protein": 25, "carbs": 10, "fat": 28}
-                ],
-                "dinner": [
-                    {"name": "Cauliflower Rice Stir Fry", "prep_time": 25, "calories": 300, "protein": 22, "carbs": 15, "fat": 18},
-                    {"name": "Baked Cod with Asparagus", "prep_time": 25, "calories": 280, "protein": 30, "carbs": 8, "fat": 12}
-                ]
-            }
-        }
-    
-    def _load_dietary_restrictions(self) -> Dict[str, List[str]]:
-        """Load foods to avoid for different dietary restrictions"""
-        return {
-            "vegetarian": ["beef", "chicken", "pork", "fish", "seafood"],
-            "vegan": ["beef", "chicken", "pork", "fish", "seafood", "dairy", "eggs", "honey"],
-            "gluten_free": ["wheat", "barley", "rye", "pasta", "bread"],
-            "dairy_free": ["milk", "cheese", "yogurt", "butter", "cream"],
-            "nut_free": ["almonds", "peanuts", "walnuts", "cashews", "tree nuts"],
-            "low_carb": ["bread", "pasta", "rice", "potatoes", "sugar"],
-            "keto": ["bread", "pasta", "rice", "fruits", "sugar", "grains"]
-        }
-    
-    async def _create_weekly_meal_plan(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
+    def _create_weekly_meal_plan(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
         """Create optimized weekly meal plan"""
-        dietary_goals = parameters.get("dietary_goals", {})
-        restrictions = parameters.get("dietary_restrictions", [])
-        time_constraints = parameters.get("time_constraints", {})
-        family_preferences = parameters.get("family_preferences", {})
-        
-        # Determine meal template to use
-        template_key = "standard"
-        if "vegetarian" in restrictions:
-            template_key = "vegetarian"
-        elif "low_carb" in restrictions or "keto" in restrictions:
-            template_key = "low_carb"
-        
-        meal_templates = self.meal_templates.get(template_key, self.meal_templates["standard"])
-        
-        # Create weekly schedule
-        weekly_plan = {}
-        total_nutrition = {"calories": 0, "protein": 0, "carbs": 0, "fat": 0}
-        
-        days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        busy_days = time_constraints.get("busy_days", [])
-        
-        for day in days:
-            daily_meals = {}
-            daily_nutrition = {"calories": 0, "protein": 0, "carbs": 0, "fat": 0}
-            
-            # Select meals based on constraints
-            for meal_type in ["breakfast", "lunch", "dinner", "snacks"]:
-                if meal_type in meal_templates:
-                    available_meals = meal_templates[meal_type]
-                    
-                    # Filter by time constraints for busy days
-                    if day in busy_days and meal_type in ["lunch", "dinner"]:
-                        available_meals = [m for m in available_meals if m["prep_time"] <= 15]
-                    
-                    # Select meal
-                    if available_meals:
-                        selected_meal = random.choice(available_meals)
-                        daily_meals[meal_type] = selected_meal
-                        
-                        # Add to nutrition totals
-                        for nutrient in ["calories", "protein", "carbs", "fat"]:
-                            daily_nutrition[nutrient] += selected_meal.get(nutrient, 0)
-            
-            weekly_plan[day] = {
-                "meals": daily_meals,
-                "daily_nutrition": daily_nutrition,
-                "prep_time_total": sum(meal.get("prep_time", 0) for meal in daily_meals.values())
-            }
-            
-            # Add to weekly totals
-            for nutrient in ["calories", "protein", "carbs", "fat"]:
-                total_nutrition[nutrient] += daily_nutrition[nutrient]
+        signature, seed = self._plan_signature(parameters)
+        restrictions, busy_days, family_size, daily_calorie_goal = signature
+        
+        # Plans are reproducible for a given seed; drawing 28 indices is cheap,
+        # so the plan is sampled on every call rather than memoized
+        arrays, busy = self._plan_arrays(restrictions, busy_days)
+        weekly_plans, weekly_totals, weekly_prep_times = self._build_weekly_plans(
+            arrays, self._sample_plans(arrays, busy, 1, np.random.default_rng(seed))
+        )
+        weekly_plan = weekly_plans[0]
+        total_nutrition = dict(zip(_NUTRIENTS, weekly_totals[0].tolist()))
         
         # Calculate averages
         avg_nutrition = {k: v/7 for k, v in total_nutrition.items()}
         
         # Compare with goals
         goal_adherence = {}
-        daily_calorie_goal = dietary_goals.get("calories_per_day", 2000)
         if daily_calorie_goal > 0:
             goal_adherence["calories"] = avg_nutrition["calories"] / daily_calorie_goal
         
@@ -241,20 +425,100 @@ class MealPlannerTool(BaseMCPTool):
             "meal_plan": weekly_plan,
             "nutrition_summary": nutrition_summary,
             "plan_duration": "7 days",
-            "total_prep_time": sum(day["prep_time_total"] for day in weekly_plan.values()),
+            "total_prep_time": int(weekly_prep_times[0]),
             "estimated_cost": self._estimate_weekly_cost(weekly_plan)
         }
     
+    def _plan_signature(self, parameters: Dict) -> Tuple[Tuple[Any, ...], int]:
+        """
+        Normalized (restrictions, busy days, family size, calorie goal) plan inputs
+        and the seed to draw with: the caller's, or one derived from the inputs
+        so identical requests get identical plans.
+        """
+        # Restrictions and busy days are only ever compared against known names,
+        # so entries are coerced to strings; odd entries then simply never match
+        signature = (
+            tuple(sorted(map(str, parameters.get("dietary_restrictions", [])))),
+            tuple(map(str, parameters.get("time_constraints", {}).get("busy_days", []))),
+            parameters.get("family_preferences", {}).get("family_size", 2),
+            parameters.get("dietary_goals", {}).get("calories_per_day", 2000)
+        )
+        seed = parameters.get("seed")
+        if seed is None:
+            # hash() of strings is salted per process; a digest is stable across restarts
+            seed = int(hash_string(repr(signature))[:16], 16)
+        elif isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+            raise ValueError(f"seed must be a non-negative integer, got {seed!r}")
+        return signature, seed
+    
+    def _plan_arrays(self, restrictions: List[str], busy_days: List[str]) -> Tuple[_TemplateArrays, np.ndarray]:
+        """Pick the template for the restrictions and flag busy days (1) per plan day"""
+        template_key = "standard"
+        if "vegetarian" in restrictions:
+            template_key = "vegetarian"
+        elif "low_carb" in restrictions or "keto" in restrictions:
+            template_key = "low_carb"
+        
+        arrays = self.template_arrays.get(template_key, self.template_arrays["standard"])
+        busy = np.array([day in busy_days for day in _PLAN_DAYS], dtype=np.intp)
+        return arrays, busy
+    
+    def _sample_plans(
+        self, arrays: _TemplateArrays, busy: np.ndarray, n_weeks: int, rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Draw one template row per week, day and meal type in a single call.
+        Returns an (n_weeks, 7, 4) index tensor; slots without candidates fall
+        on the padded "no meal" row.
+        """
+        counts = arrays.candidate_counts[busy]
+        picks = rng.integers(0, np.maximum(counts, 1), size=(n_weeks,) + counts.shape)
+        return arrays.candidates[busy[:, None], np.arange(len(_MEAL_TYPES)), picks]
+    
+    def _build_weekly_plans(
+        self, arrays: _TemplateArrays, selections: np.ndarray
+    ) -> Tuple[List[Dict[str, DayPlan]], np.ndarray, np.ndarray]:
+        """
+        Turn sampled indices into per-day DayPlan records, plus (n_weeks, 4) nutrient
+        totals and (n_weeks,) prep-time totals from the same aggregation pass
+        """
+        # Aggregate nutrition and prep time for every week and day at once
+        if _meal_kernels.NUMBA_AVAILABLE:
+            daily_nutrients, daily_prep_times = _meal_kernels.aggregate(
+                arrays.nutrients, arrays.prep_times, selections
+            )
+        else:
+            daily_nutrients = arrays.nutrients[selections].sum(axis=2)
+            daily_prep_times = arrays.prep_times[selections].sum(axis=2)
+        no_meal = len(arrays.meals)
+        
+        weekly_plans = []
+        for week_rows, week_nutrients, week_prep_times in zip(
+            selections.tolist(), daily_nutrients.tolist(), daily_prep_times.tolist()
+        ):
+            weekly_plan = {}
+            for day, rows, nutrients, prep_time in zip(_PLAN_DAYS, week_rows, week_nutrients, week_prep_times):
+                weekly_plan[day] = DayPlan(
+                    meals={
+                        meal_type: arrays.meals[row]
+                        for meal_type, row in zip(_MEAL_TYPES, rows) if row != no_meal
+                    },
+                    daily_nutrition=DayNutrition(*nutrients),
+                    prep_time_total=prep_time
+                )
+            weekly_plans.append(weekly_plan)
+        return weekly_plans, daily_nutrients.sum(axis=1), daily_prep_times.sum(axis=1)
+    
     def _calculate_variety_score(self, weekly_plan: Dict) -> float:
         """Calculate variety score based on meal diversity"""
-        all_meals = []
+        unique_names = set()
+        total_meals = 0
         for day_data in weekly_plan.values():
-            for meal in day_data["meals"].values():
-                all_meals.append(meal["name"])
-        
-        unique_meals = len(set(all_meals))
-        total_meals = len(all_meals)
+            names = [meal["name"] for meal in day_data.meals.values()]
+            unique_names.update(names)
+            total_meals += len(names)
         
+        unique_meals = len(unique_names)
         return (unique_meals / total_meals) * 10 if total_meals > 0 else 0
     
     def _calculate_health_score(self, nutrition: Dict) -> float:
@@ -263,50 +527,31 @@ class MealPlannerTool(BaseMCPTool):
         if calories == 0:
             return 0
         
-        protein_percent = (nutrition.get("protein", 0) * 4 / calories) * 100
-        carb_percent = (nutrition.get("carbs", 0) * 4 / calories) * 100
-        fat_percent = (nutrition.get("fat", 0) * 9 / calories) * 100
-        
-        score = 7  # Base score
-        
-        # Protein adequacy (15-25% ideal)
-        if 15 <= protein_percent <= 25:
-            score += 1
-        elif protein_percent < 10 or protein_percent > 30:
-            score -= 1
-        
-        # Carb balance (45-65% ideal)
-        if 45 <= carb_percent <= 65:
-            score += 1
-        elif carb_percent < 30 or carb_percent > 75:
-            score -= 1
+        macros = np.array(
+            [nutrition.get("protein", 0), nutrition.get("carbs", 0), nutrition.get("fat", 0)], dtype=np.float64
+        )
+        if _meal_kernels.NUMBA_AVAILABLE:
+            return _meal_kernels.health_score(float(calories), macros, _MACRO_BOUNDS, _MACRO_KCAL)
         
-        # Fat balance (20-35% ideal)
-        if 20 <= fat_percent <= 35:
-            score += 1
-        elif fat_percent < 15 or fat_percent > 40:
-            score -= 1
+        percents = macros * _MACRO_KCAL / calories * 100
         
-        return max(0, min(10, score))
+        # Base score 7, +1 per macro in its ideal range, -1 per macro far outside it
+        ideal = (percents >= _MACRO_BOUNDS[:, 0]) & (percents <= _MACRO_BOUNDS[:, 1])
+        poor = (percents < _MACRO_BOUNDS[:, 2]) | (percents > _MACRO_BOUNDS[:, 3])
+        return int(np.clip(7 + ideal.sum() - poor.sum(), 0, 10))
     
     def _estimate_weekly_cost(self, weekly_plan: Dict) -> float:
         """Estimate weekly cost based on meals"""
-        # Mock cost estimation - would integrate with real pricing data
-        cost_per_meal = {
-            "breakfast": 3.50,
-            "lunch": 5.00,
-            "dinner": 7.50,
-            "snacks": 2.00
-        }
-        
-        total_cost = 0
-        for day_data in weekly_plan.values():
-            for meal_type in day_data["meals"]:
-                total_cost += cost_per_meal.get(meal_type, 5.00)
-        
-        return round(total_cost, 2)
+        return self._weekly_cost_cents(weekly_plan) / 100
     
-    async def _optimize_meal_timing(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
+    def _weekly_cost_cents(self, weekly_plan: Dict) -> int:
+        """Weekly meal cost in cents"""
+        return sum(
+            _MEAL_COST_CENTS.get(meal_type, _DEFAULT_MEAL_COST_CENTS)
+            for day_data in weekly_plan.values() for meal_type in day_data.meals
+        )
+    
+    def _optimize_meal_timing(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
         """Optimize meal timing based on fitness schedule and goals"""
         fitness_schedule = parameters.get("fitness_schedule", {})
         dietary_goals = parameters.get("dietary_goals", {})
@@ -354,13 +599,13 @@ class MealPlannerTool(BaseMCPTool):
             ]
         }
     
-    async def _generate_shopping_list_from_plan(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
+    def _generate_shopping_list_from_plan(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
         """Generate organized shopping list from meal plan"""
         meal_plan = parameters.get("meal_plan", {})
         family_size = parameters.get("family_preferences", {}).get("family_size", 2)
         
         # Extract all ingredients from meal plan
-        ingredients = {}
+        ingredients: Dict[str, float] = defaultdict(float)
         
         for day, day_data in meal_plan.items():
             for meal_type, meal in day_data.get("meals", {}).items():
@@ -368,10 +613,7 @@ class MealPlannerTool(BaseMCPTool):
                 meal_ingredients = self._get_meal_ingredients(meal["name"], family_size)
                 
                 for ingredient, amount in meal_ingredients.items():
-                    if ingredient in ingredients:
-                        ingredients[ingredient] += amount
-                    else:
-                        ingredients[ingredient] = amount
+                    ingredients[ingredient] += amount
         
         # Organize by category
         categorized_list = {
@@ -384,31 +626,22 @@ class MealPlannerTool(BaseMCPTool):
             "other": []
         }
         
-        category_map = {
-            "vegetables": "produce", "fruits": "produce",
-            "chicken": "proteins", "beef": "proteins", "fish": "proteins", "eggs": "proteins",
-            "milk": "dairy", "cheese": "dairy", "yogurt": "dairy",
-            "rice": "grains", "bread": "grains", "oats": "grains",
-            "oil": "pantry", "spices": "pantry", "nuts": "pantry"
-        }
-        
+        total_cost_cents = 0
         for ingredient, amount in ingredients.items():
-            category = category_map.get(ingredient.lower(), "other")
+            ingredient_lc = ingredient.lower()
+            category = _INGREDIENT_META.get(ingredient_lc, _DEFAULT_INGREDIENT_META)[0]
+            cost_cents = _ingredient_cost_cents(ingredient_lc, amount)
+            total_cost_cents += cost_cents
             categorized_list[category].append({
                 "item": ingredient,
                 "amount": amount,
-                "estimated_cost": self._estimate_ingredient_cost(ingredient, amount)
+                "estimated_cost": cost_cents / 100
             })
         
-        total_estimated_cost = sum(
-            sum(item["estimated_cost"] for item in category_items)
-            for category_items in categorized_list.values()
-        )
-        
         return {
             "shopping_list": categorized_list,
             "total_items": sum(len(category) for category in categorized_list.values()),
-            "estimated_total_cost": round(total_estimated_cost, 2),
+            "estimated_total_cost": total_cost_cents / 100,
             "shopping_tips": [
                 "Check for sales on proteins and stock up",
                 "Buy seasonal produce for better prices",
@@ -418,58 +651,32 @@ class MealPlannerTool(BaseMCPTool):
     
     def _get_meal_ingredients(self, meal_name: str, family_size: int) -> Dict[str, float]:
         """Get ingredients for a specific meal"""
-        # Mock ingredient database - would integrate with recipe database
-        base_ingredients = {
-            "Overnight Oats": {"oats": 0.5, "milk": 0.25, "berries": 0.1, "honey": 0.02},
-            "Quinoa Buddha Bowl": {"quinoa": 0.3, "vegetables": 0.4, "olive oil": 0.02, "tahini": 0.03},
-            "Chicken Stir Fry": {"chicken": 0.2, "vegetables": 0.3, "soy sauce": 0.02, "oil": 0.01},
-            "Grilled Salmon with Vegetables": {"salmon": 0.15, "vegetables": 0.3, "lemon": 0.05, "herbs": 0.01},
-            "Greek Yogurt Parfait": {"yogurt": 0.2, "granola": 0.05, "berries": 0.1, "honey": 0.02}
-        }
-        
-        ingredients = base_ingredients.get(meal_name, {"generic_ingredients": 1.0})
-        
+        names, amounts = _BASE_INGREDIENTS.get(meal_name, _GENERIC_INGREDIENTS)
         # Scale by family size
-        scaled_ingredients = {}
-        for ingredient, amount in ingredients.items():
-            scaled_ingredients[ingredient] = amount * family_size
-        
-        return scaled_ingredients
+        return dict(zip(names, (amounts * family_size).tolist()))
     
     def _estimate_ingredient_cost(self, ingredient: str, amount: float) -> float:
         """Estimate cost of ingredient"""
-        # Mock pricing - would integrate with actual grocery pricing APIs
-        price_per_unit = {
-            "chicken": 8.0,  # per kg
-            "salmon": 15.0,
-            "vegetables": 3.0,
-            "quinoa": 6.0,
-            "oats": 2.5,
-            "milk": 1.5,  # per liter
-            "berries": 4.0,
-            "yogurt": 5.0,
-            "cheese": 8.0,
-            "eggs": 3.0,  # per dozen
-            "oil": 4.0,
-            "spices": 2.0
-        }
-        
-        unit_price = price_per_unit.get(ingredient.lower(), 3.0)
-        return round(unit_price * amount, 2)
+        return _ingredient_cost_cents(ingredient.lower(), amount) / 100
     
-    async def _create_monthly_meal_plan(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
+    def _create_monthly_meal_plan(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
         """Create a monthly meal plan with weekly variations"""
-        # Create 4 different weekly plans for variety
-        monthly_plan = {}
-        total_cost = 0
+        (restrictions, busy_days, _, _), seed = self._plan_signature(parameters)
         
-        for week in range(1, 5):
-            # Modify parameters slightly for each week to create variety
-            week_params = parameters.copy()
-            week_plan = await self._create_weekly_meal_plan(week_params, context)
-            
-            monthly_plan[f"week_{week}"] = week_plan["meal_plan"]
-            total_cost += week_plan.get("estimated_cost", 0)
+        # Each week draws from seed ^ week index for variety across the month;
+        # week 1 matches the weekly plan for the same inputs
+        arrays, busy = self._plan_arrays(restrictions, busy_days)
+        selections = np.concatenate([
+            self._sample_plans(arrays, busy, 1, np.random.default_rng(seed ^ week_index))
+            for week_index in range(4)
+        ])
+        weekly_plans, _, _ = self._build_weekly_plans(arrays, selections)
+        
+        monthly_plan = {}
+        total_cost_cents = 0
+        for week, week_plan in enumerate(weekly_plans, 1):
+            monthly_plan[f"week_{week}"] = week_plan
+            total_cost_cents += self._weekly_cost_cents(week_plan)
         
         # Add variety across weeks
         variety_suggestions = [
@@ -487,12 +694,12 @@ class MealPlannerTool(BaseMCPTool):
             "nutrition_summary": {
                 "planning_period": "4 weeks",
                 "variety_score": 9.2,  # Higher due to monthly variation
-                "estimated_monthly_cost": round(total_cost, 2)
+                "estimated_monthly_cost": total_cost_cents / 100
             },
-            "prep_schedule": await self._create_monthly_prep_schedule(monthly_plan, context)
+            "prep_schedule": self._create_monthly_prep_schedule(monthly_plan, context)
         }
     
-    async def _create_monthly_prep_schedule(self, monthly_plan: Dict, context: ExecutionContext) -> Dict[str, Any]:
+    def _create_monthly_prep_schedule(self, monthly_plan: Dict, context: ExecutionContext) -> Dict[str, Any]:
         """Create a monthly meal prep schedule"""
         prep_schedule = {
             "weekly_prep_days": ["Sunday"],
@@ -521,7 +728,7 @@ class MealPlannerTool(BaseMCPTool):
         
         return prep_schedule
     
-    async def _adapt_plan_for_goals(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
+    def _adapt_plan_for_goals(self, parameters: Dict, context: ExecutionContext) -> Dict[str, Any]:
         """Adapt meal plan for specific fitness or health goals"""
         fitness_goals = parameters.get("fitness_goals", ["general_health"])
         current_plan = parameters.get("current_meal_plan", {})
@@ -529,57 +736,7 @@ class MealPlannerTool(BaseMCPTool):
         adaptations = []
         
         for goal in fitness_goals:
-            if goal == "weight_loss":
-                adaptations.extend([
-                    {
-                        "change": "reduce_portion_sizes",
-                        "description": "Reduce main meal portions by 15-20%",
-                        "impact": "300-400 fewer calories per day"
-                    },
-                    {
-                        "change": "increase_vegetables",
-                        "description": "Fill half the plate with non-starchy vegetables",
-                        "impact": "Increased fiber and satiety"
-                    },
-                    {
-                        "change": "modify_snacks",
-                        "description": "Replace calorie-dense snacks with fruits and vegetables",
-                        "impact": "200-300 fewer calories from snacks"
-                    }
-                ])
-            
-            elif goal == "muscle_gain":
-                adaptations.extend([
-                    {
-                        "change": "increase_protein",
-                        "description": "Add protein source to each meal and snack",
-                        "impact": "20-30g additional protein per day"
-                    },
-                    {
-                        "change": "post_workout_nutrition",
-                        "description": "Include protein + carb snack within 30 minutes of workouts",
-                        "impact": "Enhanced muscle protein synthesis"
-                    },
-                    {
-                        "change": "calorie_increase",
-                        "description": "Increase overall calories by 300-500 per day",
-                        "impact": "Support for muscle building"
-                    }
-                ])
-            
-            elif goal == "endurance_performance":
-                adaptations.extend([
-                    {
-                        "change": "carb_timing",
-                        "description": "Emphasize carbs before and after long workouts",
-                        "impact": "Better energy and recovery"
-                    },
-                    {
-                        "change": "hydration_focus",
-                        "description": "Increase fluid intake and add electrolytes",
-                        "impact": "Improved endurance performance"
-                    }
-                ])
+            adaptations.extend(map(dict, _GOAL_ADAPTATIONS.get(goal, ())))
         
         # Calculate new nutrition targets
         adapted_nutrition = self._calculate_adapted_nutrition_targets(fitness_goals)
@@ -598,22 +755,11 @@ class MealPlannerTool(BaseMCPTool):
     
     def _calculate_adapted_nutrition_targets(self, fitness_goals: List[str]) -> Dict[str, float]:
         """Calculate nutrition targets based on fitness goals"""
-        base_targets = {
-            "calories": 2000,
-            "protein": 100,
-            "carbs": 250,
-            "fat": 65,
-            "fiber": 25
-        }
-        
+        targets = _BASE_NUTRITION_TARGETS.copy()
+        # Goals compound in order, so a repeated goal applies twice
         for goal in fitness_goals:
-            if goal == "weight_loss":
-                base_targets["calories"] *= 0.85  # 15% reduction
-                base_targets["protein"] *= 1.2   # Higher protein for satiety
-            elif goal == "muscle_gain":
-                base_targets["calories"] *= 1.15  # 15% increase
-                base_targets["protein"] *= 1.5   # Higher protein for muscle building
-            elif goal == "endurance_performance":
-                base_targets["carbs"] *= 1.3     # Higher carbs for energy
-        
-        return {k: round(v, 1) for k, v in base_targets.items()}
\ No newline at end of file
+            multipliers = _GOAL_MULTIPLIERS.get(goal)
+            if multipliers is not None:
+                targets *= multipliers
+        
+        return dict(zip(_TARGET_NUTRIENTS, np.round(targets, 1).tolist()))
@@ -4,18 +4,49 @@ Comprehensive nutritional assessment and optimization
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-import statistics
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 
+import httpx
+import numpy as np
+
+from agents.milo_nutrition.tools import _meal_kernels
 from shared.mcp_framework.base_server import BaseMCPTool, ExecutionContext, ExecutionResult
 
+# Per-100g database columns packed into the nutrient matrix, and the names
+# they are reported under
+_DB_COLUMNS = ("calories_per_100g", "protein", "carbs", "fat", "fiber")
+_NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber")
+# Matrix columns of the macros, with their kcal per gram
+_MACRO_COLUMNS = np.array([1, 2, 3])
+_MACRO_KCAL = np.array([4.0, 4.0, 9.0])
+# Daily score buckets by distance of a target achievement percentage from
+# 100%: within 10 points -> 10, 20 -> 8, 30 -> 6, otherwise 4
+_PCT_BINS = np.array([10.0, 20.0, 30.0])
+_PCT_SCORES = np.array([10, 8, 6, 4])
+
 class NutritionAnalyzerTool(BaseMCPTool):
     """Comprehensive nutritional assessment and optimization"""
     
-    def __init__(self):
-        super().__init__("nutrition_analyzer", "Analyze nutritional content and provide optimization recommendations")
+    # Food names are matched against database keys lowercased with spaces as underscores
+    _TRANS = str.maketrans(" ", "_")
+    
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        super().__init__("nutrition_analyzer", "Analyze nutritional content and provide optimization recommendations", http=http)
         self.nutrition_database = self._load_nutrition_database()
         self.daily_values = self._load_daily_values()
+        
+        # Structure-of-arrays view of the database: food -> row of a
+        # (foods, nutrients) per-100g matrix
+        self._food_index = {food: row for row, food in enumerate(self.nutrition_database)}
+        self._nut_matrix = np.array(
+            [[food_data[column] for column in _DB_COLUMNS] for food_data in self.nutrition_database.values()],
+            dtype=np.float64
+        )
+    
+    @staticmethod
+    def _normalize(name: str) -> str:
+        """Normalize a food name to the database key format"""
+        return name.lower().translate(NutritionAnalyzerTool._TRANS)
     
     def get_parameter_schema(self) -> Dict[str, Any]:
         return {
@@ -171,58 +202,39 @@ class NutritionAnalyzerTool(BaseMCPTool):
     
     async def _analyze_meal_nutrition(self, food_items: List[Dict], context: ExecutionContext) -> Dict[str, Any]:
         """Analyze nutritional content of a meal"""
-        total_nutrition = {
-            "calories": 0,
-            "protein": 0,
-            "carbs": 0,
-            "fat": 0,
-            "fiber": 0,
-            "sugar": 0,
-            "sodium": 0,
-            "vitamins": {},
-            "minerals": {}
-        }
-        
-        meal_details = []
+        total_nutrition = self._meal_summary((0,) * len(_NUTRIENTS))
         
+        # Gather database rows and serving factors for the foods we know
+        known_items = []
+        rows = []
+        serving_factors = []
         for item in food_items:
-            food_name = item.get("name", "").lower().replace(" ", "_")
-            amount = item.get("amount", 100)  # grams
+            food_name = self._normalize(item.get("name", ""))
+            row = self._food_index.get(food_name)
+            if row is not None:
+                amount = item.get("amount", 100)  # grams
+                known_items.append((item.get("name"), amount))
+                rows.append(row)
+                serving_factors.append(amount / 100)  # Convert to per serving
+        
+        meal_details = []
+        macro_percentages = {"protein": 0, "carbs": 0, "fat": 0}
+        if rows:
+            # Scale every serving at once; the totals are one matrix product
+            food_rows = self._nut_matrix[rows]
+            factors = np.array(serving_factors)
+            servings = food_rows * factors[:, None]
+            totals = factors @ food_rows
             
-            if food_name in self.nutrition_database:
-                food_data = self.nutrition_database[food_name]
-                serving_factor = amount / 100  # Convert to per serving
-                
-                # Calculate nutrition for this serving
-                serving_nutrition = {
-                    "food": item.get("name"),
-                    "amount": f"{amount}g",
-                    "calories": food_data["calories_per_100g"] * serving_factor,
-                    "protein": food_data["protein"] * serving_factor,
-                    "carbs": food_data["carbs"] * serving_factor,
-                    "fat": food_data["fat"] * serving_factor,
-                    "fiber": food_data["fiber"] * serving_factor
-                }
-                
-                meal_details.append(serving_nutrition)
-                
-                # Add to totals
-                total_nutrition["calories"] += serving_nutrition["calories"]
-                total_nutrition["protein"] += serving_nutrition["protein"]
-                total_nutrition["carbs"] += serving_nutrition["carbs"]
-                total_nutrition["fat"] += serving_nutrition["fat"]
-                total_nutrition["fiber"] += serving_nutrition["fiber"]
-        
-        # Calculate macro percentages
-        total_cals = total_nutrition["calories"]
-        if total_cals > 0:
-            macro_percentages = {
-                "protein": (total_nutrition["protein"] * 4 / total_cals) * 100,
-                "carbs": (total_nutrition["carbs"] * 4 / total_cals) * 100,
-                "fat": (total_nutrition["fat"] * 9 / total_cals) * 100
-            }
-        else:
-            macro_percentages = {"protein": 0, "carbs": 0, "fat": 0}
+            for (food, amount), serving in zip(known_items, servings.tolist()):
+                meal_details.append({"food": food, "amount": f"{amount}g", **dict(zip(_NUTRIENTS, serving))})
+            total_nutrition.update(zip(_NUTRIENTS, totals.tolist()))
+            
+            # Calculate macro percentages
+            total_cals = totals[0]
+            if total_cals > 0:
+                percentages = totals[_MACRO_COLUMNS] * _MACRO_KCAL / total_cals * 100
+                macro_percentages = dict(zip(macro_percentages, percentages.tolist()))
         
         # Health assessment
         health_score = self._calculate_meal_health_score(total_nutrition, macro_percentages)
@@ -238,8 +250,45 @@ class NutritionAnalyzerTool(BaseMCPTool):
         
         return {"nutrition_analysis": analysis}
     
+    def _bulk_nutrition(
+        self, names: Sequence[Optional[str]], amounts: Sequence[float], meal_boundaries: Sequence[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nutrient totals for consecutive meals flattened into names/amounts;
+        meal i covers entries meal_boundaries[i]:meal_boundaries[i + 1].
+        Names are normalized database keys, or None for unknown foods.
+        Returns (meals, nutrients) per-meal totals and the day's totals.
+        """
+        rows = [self._food_index.get(name, 0) for name in names]
+        # One trailing zero row keeps every start index in range for reduceat,
+        # including empty meals at the end of the day
+        scaled_rows = np.zeros((len(names) + 1, len(_NUTRIENTS)))
+        scaled_rows[:-1] = self._nut_matrix[rows] * (np.array(amounts, dtype=np.float64) / 100)[:, None]
+        
+        boundaries = np.array(meal_boundaries)
+        meal_totals = np.add.reduceat(scaled_rows, boundaries[:-1], axis=0)
+        # reduceat yields the start row for empty segments; empty meals total zero
+        meal_totals[boundaries[:-1] == boundaries[1:]] = 0
+        return meal_totals, meal_totals.sum(axis=0)
+    
+    @staticmethod
+    def _meal_summary(totals: Sequence[float]) -> Dict[str, Any]:
+        """Meal summary record for nutrient totals in _NUTRIENTS order"""
+        return {
+            **dict(zip(_NUTRIENTS, totals)),
+            "sugar": 0,
+            "sodium": 0,
+            "vitamins": {},
+            "minerals": {}
+        }
+    
     def _calculate_meal_health_score(self, nutrition: Dict, macros: Dict) -> float:
         """Calculate a health score for the meal (0-10)"""
+        if _meal_kernels.NUMBA_AVAILABLE:
+            return _meal_kernels.score_meal(
+                float(macros["protein"]), float(nutrition["fiber"]), float(nutrition["calories"])
+            )
+        
         score = 7.0  # Start with base score
         
         # Protein adequacy (25-35% is ideal)
@@ -298,18 +347,33 @@ class NutritionAnalyzerTool(BaseMCPTool):
         
         meal_breakdown = {}
         
-        # Process each meal
-        for meal_time, foods in daily_log.items():
-            if isinstance(foods, list):
-                meal_nutrition = await self._analyze_meal_nutrition(foods, context)
-                meal_totals = meal_nutrition["nutrition_analysis"]["meal_summary"]
-                
-                meal_breakdown[meal_time] = meal_totals
-                daily_totals["meals_logged"] += 1
-                
-                # Add to daily totals
-                for nutrient in ["calories", "protein", "carbs", "fat", "fiber"]:
-                    daily_totals[nutrient] += meal_totals.get(nutrient, 0)
+        # Flatten every meal's foods so the whole day is scaled and reduced in
+        # one batch; unknown foods keep their slot with a zero amount
+        meals = [(meal_time, foods) for meal_time, foods in daily_log.items() if isinstance(foods, list)]
+        names = []
+        amounts = []
+        meal_boundaries = [0]
+        has_known_food = []
+        for _, foods in meals:
+            known = False
+            for item in foods:
+                food_name = self._normalize(item.get("name", ""))
+                if food_name in self._food_index:
+                    names.append(food_name)
+                    amounts.append(item.get("amount", 100))
+                    known = True
+                else:
+                    names.append(None)
+                    amounts.append(0)
+            meal_boundaries.append(len(names))
+            has_known_food.append(known)
+        
+        meal_totals, day_totals = self._bulk_nutrition(names, amounts, meal_boundaries)
+        for (meal_time, _), totals, known in zip(meals, meal_totals.tolist(), has_known_food):
+            meal_breakdown[meal_time] = self._meal_summary(totals if known else (0,) * len(_NUTRIENTS))
+        daily_totals["meals_logged"] = len(meals)
+        if any(has_known_food):
+            daily_totals.update(zip(_NUTRIENTS, day_totals.tolist()))
         
         # Calculate targets based on user profile
         targets = self._calculate_personal_targets(user_profile)
@@ -372,19 +436,15 @@ class NutritionAnalyzerTool(BaseMCPTool):
     
     def _calculate_daily_nutrition_score(self, achievements: Dict) -> float:
         """Calculate overall daily nutrition score"""
-        scores = []
-        for nutrient, data in achievements.items():
-            percentage = data["percentage"]
-            if 90 <= percentage <= 110:
-                scores.append(10)
-            elif 80 <= percentage <= 120:
-                scores.append(8)
-            elif 70 <= percentage <= 130:
-                scores.append(6)
-            else:
-                scores.append(4)
-        
-        return statistics.mean(scores) if scores else 5.0
+        percentages = np.fromiter((data["percentage"] for data in achievements.values()), dtype=np.float64)
+        if _meal_kernels.NUMBA_AVAILABLE:
+            return _meal_kernels.score_daily(percentages)
+        
+        if not len(percentages):
+            return 5.0
+        # Bucket bounds are inclusive, so bin on the distance from 100% with right=True
+        buckets = np.digitize(np.abs(percentages - 100), _PCT_BINS, right=True)
+        return float(_PCT_SCORES[buckets].mean())
     
     def _generate_daily_recommendations(self, achievements: Dict) -> List[str]:
         """Generate daily nutrition recommendations"""
@@ -564,9 +624,8 @@ class NutritionAnalyzerTool(BaseMCPTool):
         comparisons = []
         
         for food in food_items:
-            food_key = food.lower().replace(" ", "_")
-            if food_key in self.nutrition_database:
-                nutrition = self.nutrition_database[food_key]
+            nutrition = self.nutrition_database.get(self._normalize(food))
+            if nutrition is not None:
                 comparisons.append({
                     "food": food,
                     "per_100g": nutrition,
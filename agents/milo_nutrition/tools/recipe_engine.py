@@ -4,16 +4,18 @@ Intelligent recipe discovery and management
 """
 
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import json
 
+import httpx
+
 from shared.mcp_framework.base_server import BaseMCPTool, ExecutionContext, ExecutionResult
 
 class RecipeEngineTool(BaseMCPTool):
     """Intelligent recipe discovery and management"""
     
-    def __init__(self):
-        super().__init__("recipe_engine", "Discover and manage recipes based on available ingredients")
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        super().__init__("recipe_engine", "Discover and manage recipes based on available ingredients", http=http)
         self.recipe_cache = {}
         self.user_preferences = {}
     
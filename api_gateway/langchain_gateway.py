@@ -10,6 +10,7 @@ import json
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
@@ -17,6 +18,7 @@ from shared.langchain_framework.a2a_coordinator import a2a_coordinator, A2AMessa
 from shared.langchain_framework.workflow_orchestrator import orchestrator
 from shared.utils.config import config_manager
 from shared.utils.logging import setup_logging
+from shared.utils.helpers import json_dumps_bytes
 
 class WorkflowRequest(BaseModel):
     """Workflow execution request"""
@@ -472,6 +474,30 @@ class LangChainAPIGateway:
                 self.logger.error(f"Error sending A2A message: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
         
+        @self.app.post("/a2a/message/stream")
+        async def stream_a2a_message(message_data: Dict[str, Any]):
+            """Send an A2A message and stream the response as server-sent events"""
+            try:
+                message = A2AMessage(
+                    from_agent=message_data["from_agent"],
+                    to_agent=message_data["to_agent"],
+                    intent=message_data["intent"],
+                    payload=message_data.get("payload", {}),
+                    session_id=message_data.get("session_id", "default")
+                )
+            except KeyError as e:
+                raise HTTPException(status_code=400, detail=f"Missing field: {e}")
+            
+            async def event_stream():
+                async for chunk in a2a_coordinator.stream_message(message):
+                    yield b"data: " + json_dumps_bytes(chunk) + b"\n\n"
+            
+            return StreamingResponse(
+                event_stream(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"}
+            )
+        
         @self.app.post("/a2a/broadcast")
         async def broadcast_a2a_message(message_data: Dict[str, Any]):
             """Broadcast an A2A message to all agents"""
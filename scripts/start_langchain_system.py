@@ -55,7 +55,7 @@ class LangChainSystemManager:
             # Create agent instances
             self.agents["bucky"] = LangChainBuckyAgent()
             self.agents["luna"] = LangChainLunaAgent()
-            self.agents["milo"] = LangChainMiloAgent()
+            self.agents["milo"] = await LangChainMiloAgent.create()
             self.agents["nani"] = LangChainNaniAgent()
             
             self.logger.info(f"Initialized {len(self.agents)} agents")
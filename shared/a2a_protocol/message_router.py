@@ -3,12 +3,18 @@ A2A (Agent-to-Agent) Message Protocol
 Handles communication between different agents
 """
 
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Union
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
 import json
 
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
 class MessageIntent(Enum):
     """Types of A2A message intents"""
     PANTRY_INVENTORY_STATUS = "pantry_inventory_status"
@@ -22,7 +28,11 @@ class MessageIntent(Enum):
     NUTRITION_ANALYSIS = "nutrition_analysis"
     SCHEDULE_CONFLICT_RESOLUTION = "schedule_conflict_resolution"
 
-@dataclass
+def _default_message_id(timestamp: datetime, from_agent: str) -> str:
+    """Message id derived for messages sent without one"""
+    return f"msg_{timestamp.timestamp()}_{hash(from_agent)}"
+
+@dataclass(frozen=True, slots=True)
 class A2AMessage:
     """A2A message structure"""
     from_agent: str
@@ -38,7 +48,8 @@ class A2AMessage:
     
     def __post_init__(self):
         if self.message_id is None:
-            self.message_id = f"msg_{self.timestamp.timestamp()}_{hash(self.from_agent)}"
+            # Frozen instances can only fill in the derived id through object.__setattr__
+            object.__setattr__(self, "message_id", _default_message_id(self.timestamp, self.from_agent))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary"""
@@ -62,6 +73,40 @@ class A2AMessage:
             data["timestamp"] = datetime.fromisoformat(data["timestamp"])
         return cls(**data)
 
+if MSGSPEC_AVAILABLE:
+    class A2AMessageStruct(msgspec.Struct, kw_only=True, frozen=True, forbid_unknown_fields=True):
+        """Inbound A2A message decoded natively by msgspec; a frozen mirror of A2AMessage"""
+        from_agent: str
+        to_agent: str
+        intent: str
+        payload: Dict[str, Any]
+        session_id: str
+        message_id: Optional[str] = None
+        timestamp: datetime = msgspec.field(default_factory=datetime.now)
+        priority: str = "normal"
+        requires_response: bool = True
+        metadata: Optional[Dict[str, Any]] = None
+        
+        def __post_init__(self):
+            if self.message_id is None:
+                msgspec.structs.force_setattr(
+                    self, "message_id", _default_message_id(self.timestamp, self.from_agent)
+                )
+        
+        to_dict = A2AMessage.to_dict
+
+def decode_a2a_message(data: Dict[str, Any]) -> Union[A2AMessage, "A2AMessageStruct"]:
+    """
+    Build a read-only inbound message from a dict. With msgspec installed the
+    fields are type-checked and decoded straight into A2AMessageStruct, which
+    has the same attributes and to_dict as A2AMessage.
+    """
+    if MSGSPEC_AVAILABLE:
+        return msgspec.convert(data, A2AMessageStruct)
+    if isinstance(data.get("timestamp"), str):
+        data = {**data, "timestamp": datetime.fromisoformat(data["timestamp"])}
+    return A2AMessage(**data)
+
 @dataclass
 class A2AResponse:
     """A2A response structure"""
@@ -151,8 +196,7 @@ class A2AMessageRouter:
             if exclude_self and agent_name == message.from_agent:
                 continue
             
-            message.to_agent = agent_name
-            response = await self.send_message(message)
+            response = await self.send_message(replace(message, to_agent=agent_name))
             responses.append(response)
         
         return responses
@@ -4,7 +4,7 @@ Coordinates communication between LangChain agents
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, AsyncIterator
 from datetime import datetime
 import logging
 from dataclasses import dataclass
@@ -92,6 +92,41 @@ class LangChainA2ACoordinator:
                 "message_id": message.message_id
             }
     
+    async def stream_message(self, message: A2AMessage) -> AsyncIterator[Dict[str, Any]]:
+        """Send a message to another agent and yield its response chunks"""
+        if message.to_agent not in self.agents:
+            yield {
+                "success": False,
+                "error": f"Agent {message.to_agent} not found",
+                "message_id": message.message_id
+            }
+            return
+        
+        self.message_history.append(message)
+        target_agent = self.agents[message.to_agent]
+        
+        try:
+            async for chunk in target_agent.stream_a2a_message({
+                "intent": message.intent,
+                "payload": message.payload,
+                "from_agent": message.from_agent,
+                "session_id": message.session_id,
+                "message_id": message.message_id
+            }):
+                yield {
+                    "success": True,
+                    "data": chunk,
+                    "message_id": message.message_id,
+                    "timestamp": datetime.now().isoformat()
+                }
+        except Exception as e:
+            self.logger.error(f"Error streaming A2A message: {e}")
+            yield {
+                "success": False,
+                "error": str(e),
+                "message_id": message.message_id
+            }
+    
     async def broadcast_message(self, message: A2AMessage, exclude_sender: bool = True) -> List[Dict[str, Any]]:
         """Broadcast a message to all registered agents"""
         responses = []
@@ -4,7 +4,8 @@ Base classes for LangChain-based agents
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional, Callable
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Any, Optional, Callable, AsyncIterator
 from datetime import datetime
 import logging
 from pathlib import Path
@@ -47,6 +48,7 @@ class LangChainBaseAgent:
         
         # A2A message handlers
         self.a2a_handlers: Dict[str, Callable] = {}
+        self.a2a_stream_handlers: Dict[str, Callable] = {}
         self._register_a2a_handlers()
         
         self.logger.info(f"LangChain agent {agent_name} initialized with {len(self.tools)} tools")
@@ -141,6 +143,8 @@ class LangChainBaseAgent:
             if intent in self.a2a_handlers:
                 handler = self.a2a_handlers[intent]
                 result = await handler(payload, message_data)
+                if is_dataclass(result):
+                    result = asdict(result)
                 return {
                     "success": True,
                     "data": result,
@@ -161,6 +165,31 @@ class LangChainBaseAgent:
                 "agent": self.agent_name
             }
     
+    async def stream_a2a_message(self, message_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Process an A2A message, yielding partial results as they are produced"""
+        intent = message_data.get("intent", "")
+        payload = message_data.get("payload", {})
+        
+        # Intents without a streaming handler produce a single chunk
+        if intent not in self.a2a_stream_handlers:
+            yield await self.process_a2a_message(message_data)
+            return
+        
+        try:
+            async for chunk in self.a2a_stream_handlers[intent](payload, message_data):
+                yield {
+                    "success": True,
+                    "data": chunk,
+                    "agent": self.agent_name
+                }
+        except Exception as e:
+            self.logger.error(f"A2A stream processing failed: {e}")
+            yield {
+                "success": False,
+                "error": str(e),
+                "agent": self.agent_name
+            }
+    
     def add_tool(self, tool: BaseTool):
         """Add a tool to the agent"""
         self.tools.append(tool)
@@ -171,6 +200,11 @@ class LangChainBaseAgent:
         self.a2a_handlers[intent] = handler
         self.logger.info(f"Registered A2A handler for intent: {intent}")
     
+    def register_a2a_stream_handler(self, intent: str, handler: Callable):
+        """Register a streaming A2A message handler (an async generator)"""
+        self.a2a_stream_handlers[intent] = handler
+        self.logger.info(f"Registered A2A stream handler for intent: {intent}")
+    
     def get_agent_info(self) -> Dict[str, Any]:
         """Get agent information"""
         return {
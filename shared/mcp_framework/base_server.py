@@ -6,19 +6,29 @@ Provides core server functionality for all agents
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence
 from dataclasses import dataclass
 from datetime import datetime
+import httpx
 import uvicorn
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-@dataclass
+from shared.utils.helpers import json_dumps_bytes
+
+class AgentJSONResponse(JSONResponse):
+    """JSON response rendered with json_dumps_bytes, so orjson is used when installed"""
+    
+    def render(self, content: Any) -> bytes:
+        return json_dumps_bytes(content)
+
+@dataclass(frozen=True, slots=True)
 class ExecutionContext:
-    """Context for tool execution"""
+    """Context for tool execution; immutable so agents can share one per session"""
     user_id: str
     session_id: str
-    permissions: List[str]
+    permissions: Sequence[str]
     metadata: Optional[Dict[str, Any]] = None
 
 @dataclass
@@ -32,9 +42,11 @@ class ExecutionResult:
 class BaseMCPTool:
     """Base class for all MCP tools"""
     
-    def __init__(self, name: str, description: str = ""):
+    def __init__(self, name: str, description: str = "", http: Optional[httpx.AsyncClient] = None):
         self.name = name
         self.description = description
+        # Connection pool shared by the agent's tools for external API calls
+        self.http = http
         self.logger = logging.getLogger(f"tool.{name}")
     
     async def execute(self, params: Dict[str, Any], context: ExecutionContext) -> ExecutionResult:
@@ -60,7 +72,11 @@ class BaseMCPServer:
         self.logger = logging.getLogger(f"agent.{agent_name}")
         
         # Initialize FastAPI app
-        self.app = FastAPI(title=f"Agent {agent_name}", version="1.0.0")
+        self.app = FastAPI(
+            title=f"Agent {agent_name}",
+            version="1.0.0",
+            default_response_class=AgentJSONResponse
+        )
         self._setup_routes()
         
         # Initialize logging
@@ -74,6 +90,14 @@ class BaseMCPServer:
         self.tools[tool.name] = tool
         self.logger.info(f"Registered tool: {tool.name}")
     
+    def get_tool(self, tool_name: str) -> Optional[BaseMCPTool]:
+        """Look up a tool by name; subclasses may load tools on demand"""
+        return self.tools.get(tool_name)
+    
+    def tool_names(self) -> List[str]:
+        """Names of every tool the server offers, loaded or not"""
+        return list(self.tools.keys())
+    
     def _setup_routes(self):
         """Setup FastAPI routes"""
         
@@ -82,16 +106,16 @@ class BaseMCPServer:
             return {
                 "status": "healthy",
                 "agent": self.agent_name,
-                "tools": list(self.tools.keys()),
+                "tools": self.tool_names(),
                 "timestamp": datetime.now().isoformat()
             }
         
         @self.app.post("/tools/{tool_name}/execute")
         async def execute_tool(tool_name: str, request: Dict[str, Any]):
-            if tool_name not in self.tools:
+            tool = self.get_tool(tool_name)
+            if tool is None:
                 raise HTTPException(status_code=404, detail=f"Tool {tool_name} not found")
             
-            tool = self.tools[tool_name]
             context = ExecutionContext(
                 user_id=request.get("user_id", "default"),
                 session_id=request.get("session_id", "default"),
@@ -119,7 +143,7 @@ class BaseMCPServer:
                         "description": tool.description,
                         "schema": tool.get_schema()
                     }
-                    for tool in self.tools.values()
+                    for tool in map(self.get_tool, self.tool_names())
                 ]
             }
         
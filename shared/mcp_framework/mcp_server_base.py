@@ -4,10 +4,9 @@ Compliant with Model Context Protocol specification
 """
 
 import asyncio
-import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Iterable, Union
 from abc import ABC, abstractmethod
 import uuid
 
@@ -16,6 +15,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
+from shared.utils.helpers import json_dumps_bytes
+
 
 class MCPTool(BaseModel):
     """MCP Tool definition"""
@@ -192,7 +193,7 @@ class BaseMCPServer(ABC):
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(result, indent=2)
+                            "text": json_dumps_bytes(result, indent=True).decode()
                         }
                     ],
                     "isError": False
@@ -246,6 +247,9 @@ class BaseMCPServer(ABC):
         
         try:
             content = await self._read_resource(uri)
+            if isinstance(content, bytes):
+                # JSON-RPC carries resource text, so encoded payloads are decoded once here
+                content = content.decode("utf-8")
             return MCPResponse(
                 id=request.id,
                 result={
@@ -292,14 +296,26 @@ class BaseMCPServer(ABC):
         )
         self.logger.info(f"Registered resource: {uri}")
     
+    def register_tools_batch(self, tools: Iterable[MCPTool]):
+        """Register several prebuilt tools in one pass with a single log line"""
+        new_tools = {tool.name: tool for tool in tools}
+        self.tools.update(new_tools)
+        self.logger.info(f"Registered tools: {', '.join(new_tools)}")
+    
+    def register_resources_batch(self, resources: Iterable[MCPResource]):
+        """Register several prebuilt resources in one pass with a single log line"""
+        new_resources = {resource.uri: resource for resource in resources}
+        self.resources.update(new_resources)
+        self.logger.info(f"Registered resources: {', '.join(new_resources)}")
+    
     @abstractmethod
     async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Execute a tool - must be implemented by subclasses"""
         pass
     
     @abstractmethod
-    async def _read_resource(self, uri: str) -> str:
-        """Read a resource - must be implemented by subclasses"""
+    async def _read_resource(self, uri: str) -> Union[str, bytes]:
+        """Read a resource - must be implemented by subclasses; bytes must be UTF-8"""
         pass
     
     @abstractmethod
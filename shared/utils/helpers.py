@@ -5,13 +5,23 @@ Common utility functions used across the project
 
 import json
 import hashlib
+import threading
+import time
 import uuid
-from typing import Dict, List, Any, Optional, Union
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Any, Optional, Union, Iterator
 from datetime import datetime, timedelta
 import asyncio
 import aiohttp
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 def generate_id(prefix: str = "") -> str:
     """Generate a unique ID"""
     unique_id = str(uuid.uuid4()).replace("-", "")[:12]
@@ -35,6 +45,27 @@ def safe_json_dumps(obj: Any, default: str = "") -> str:
     except (TypeError, ValueError):
         return default
 
+def _json_default(obj: Any) -> Any:
+    """Fallback encoder for the stdlib path; orjson encodes dataclasses natively"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    return str(obj)
+
+def json_dumps_bytes(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize object to UTF-8 JSON bytes, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(obj, sort_keys=sort_keys, indent=2 if indent else None, default=_json_default).encode()
+
+def json_loads_bytes(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def merge_dicts(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, Any]:
     """Deep merge two dictionaries"""
     result = dict1.copy()
@@ -100,6 +131,62 @@ def ensure_directory(path: Union[str, Path]) -> Path:
     path.mkdir(parents=True, exist_ok=True)
     return path
 
+class TTLStore:
+    """
+    Size-bounded mapping whose entries expire after a TTL.
+    The least recently used entry is evicted once maxsize is reached.
+    """
+    
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def __setitem__(self, key: Any, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            expires_at, value = self._data[key]
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                raise KeyError(key)
+            self._data.move_to_end(key)
+            return value
+    
+    def __delitem__(self, key: Any):
+        with self._lock:
+            del self._data[key]
+    
+    def __contains__(self, key: Any) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            return iter(list(self._data))
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
 async def retry_async(
     func,
     max_retries: int = 3,